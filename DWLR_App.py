@@ -1,16 +1,37 @@
+import json
 import os
-import glob
-import re
-import requests
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
 import pandas as pd
 import numpy as np
 import streamlit as st
 import plotly.express as px
 
+import dwlr_analytics
+import dwlr_cube
+import dwlr_export
+import dwlr_map
+import dwlr_profiling
+import dwlr_query
+import dwlr_store
+import dwlr_weather
+
 # -------------------------
 # API key & Page Config
 # -------------------------
-OPENWEATHER_API_KEY = st.secrets["OPENWEATHER_API_KEY"]
+WEATHER_BACKEND = os.environ.get("DWLR_WEATHER_BACKEND", "openweather")  # "stub" for offline use
+WEATHER_STUB_LATENCY = float(os.environ.get("DWLR_WEATHER_STUB_LATENCY", "0"))  # seconds per stub lookup
+OPENWEATHER_API_KEY = None
+if WEATHER_BACKEND != "stub":
+    try:
+        OPENWEATHER_API_KEY = st.secrets.get("OPENWEATHER_API_KEY")
+    except FileNotFoundError:  # no secrets.toml; weather is then reported as unavailable
+        pass
+WEATHER_WAIT_SECONDS = 8
+TOP_WELLS = 15
+TREND_COLOURS = {"Declining": "#d7301f", "No trend": "#969696", "Rising": "#2b8cbe"}
+PROFILE_HISTORY = 50  # reruns kept per session for the profiling log export
+WELL_TABLE_COLUMNS = ["STATE_UT", "DISTRICT", "BLOCK", "VILLAGE", "DROP_YEAR", "DROP_Z", "SEN_SLOPE", "TREND"]
 st.set_page_config(
     page_title="Groundwater Evaluation Dashboard",
     page_icon="💧",
@@ -96,70 +117,35 @@ if 'soil_type' not in st.session_state:
 if 'recommended_crops' not in st.session_state:
     st.session_state.recommended_crops = ""
 
+# Timing spans for this rerun; a no-op unless DWLR_PROFILE=1
+profiler = dwlr_profiling.Profiler(page=st.session_state.page)
+
 # -------------------------
 # Utilities & Data Loading
 # -------------------------
-def _classify_season(dt: pd.Timestamp) -> str:
-    if pd.isna(dt): return "Unknown"
-    if dt.month in (1, 2, 3, 4, 5): return "Premonsoon"
-    if dt.month in (8, 10, 11, 12): return "Postmonsoon"
-    return "Other"
-
-@st.cache_data
-def load_all_data() -> pd.DataFrame:
-    base_url = "https://raw.githubusercontent.com/TharunPranav2007/Groundwater-Level-Monitoring-using-DWLR-Data/main/"
-    file_names = [
-        "august_wl_1994-2023_compressed-clean.csv",
-        "january_wl_1994-2024-compressed-clean.xlsx",
-        "post-monsoon_wl_1994-2023_compressed-clean.xlsx",
-        "pre-monsoon_1994-2003-clean.csv",
-        "pre-monsoon_2004-2013-clean.csv",
-        "pre-monsoon_2014-2024-clean.csv"
-    ]
-    file_urls = [base_url + name for name in file_names]
+# All data logic lives in the headless query engine, loaded once per process and shared by every session.
+# Keyed by the store fingerprint, so appended batches are picked up on the next rerun.
+@dwlr_profiling.counted_cache(st.cache_resource(show_spinner="Loading groundwater data...", max_entries=1))
+def load_query_engine(data_key: str) -> dwlr_query.QueryEngine:
+    return dwlr_query.get_engine()
 
-    parts = []
-    for url in file_urls:
-        df = None
-        try:
-            if url.endswith('.csv'):
-                df = pd.read_csv(url, parse_dates=["DATE"], dayfirst=True, low_memory=False, encoding='utf-8')
-            elif url.endswith('.xlsx'):
-                df = pd.read_excel(url, parse_dates=["DATE"])
-
-            if df is None or df.empty: continue
-            
-            df.columns = [c.strip().upper() for c in df.columns]
-            for col in ["STATE_UT", "DISTRICT", "BLOCK", "VILLAGE"]:
-                if col in df.columns:
-                    df[col] = df[col].astype(str).str.strip().str.replace(r"\s+", " ", regex=True).replace({"nan": np.nan, "None": np.nan})
-                    df.loc[df[col].notna(), col] = df.loc[df[col].notna(), col].str.title()
-            if "DATE" in df.columns:
-                df["SEASON"] = df["DATE"].apply(_classify_season)
-            parts.append(df)
-        except Exception as e:
-            st.warning(f"Could not read file from URL: {os.path.basename(url)}. Error: {e}")
-            continue
+@dwlr_profiling.counted_cache(st.cache_resource)
+def get_weather_client() -> dwlr_weather.WeatherClient:
+    if WEATHER_BACKEND == "stub": return dwlr_weather.WeatherClient(dwlr_weather.StubBackend(latency=WEATHER_STUB_LATENCY))
+    return dwlr_weather.WeatherClient(dwlr_weather.OpenWeatherBackend(OPENWEATHER_API_KEY))
 
-    if not parts: st.error("No valid data could be loaded from the provided URLs."); st.stop()
-    
-    df_all = pd.concat(parts, ignore_index=True)
-    if "DTWL" in df_all.columns and "DATE" in df_all.columns:
-        df_all = df_all.dropna(subset=["DTWL", "DATE"])
-    return df_all
+@dwlr_profiling.counted_cache(st.cache_resource)
+def get_report_exporter() -> dwlr_export.ReportExporter:
+    return dwlr_export.ReportExporter()
 
-@st.cache_data
-def precompute_unique_values(df: pd.DataFrame):
-    uniques = {}
-    uniques["states"] = sorted(df["STATE_UT"].dropna().unique()) if "STATE_UT" in df.columns else []
-    uniques["districts_by_state"] = df.groupby("STATE_UT")["DISTRICT"].apply(lambda x: sorted(x.dropna().unique())).to_dict() if {"STATE_UT","DISTRICT"}.issubset(df.columns) else {}
-    uniques["blocks_by_district"] = df.groupby("DISTRICT")["BLOCK"].apply(lambda x: sorted(x.dropna().unique())).to_dict() if {"DISTRICT","BLOCK"}.issubset(df.columns) else {}
-    uniques["villages_by_block"] = df.groupby("BLOCK")["VILLAGE"].apply(lambda x: sorted(x.dropna().unique())).to_dict() if {"BLOCK","VILLAGE"}.issubset(df.columns) else {}
-    uniques["pincodes_by_village"] = df.groupby("VILLAGE")["PINCODE"].apply(lambda x: sorted(x.dropna().unique())).to_dict() if {"VILLAGE","PINCODE"}.issubset(df.columns) else {}
-    return uniques
-
-df_all = load_all_data()
-uniques = precompute_unique_values(df_all)
+with profiler.span("load_query_engine"):
+    engine = load_query_engine(dwlr_store.data_fingerprint())
+for issue in engine.issues:
+    st.warning(issue)
+if WEATHER_BACKEND != "stub" and not OPENWEATHER_API_KEY:
+    st.warning("OPENWEATHER_API_KEY is not set in .streamlit/secrets.toml, so weather data is unavailable. Set DWLR_WEATHER_BACKEND=stub to use offline stub readings.")
+if engine.df.empty: st.error("No valid data could be loaded from the provided URLs."); st.stop()
+uniques = engine.uniques
 
 # -------------------------
 # Sidebar (always visible)
@@ -193,20 +179,28 @@ st.sidebar.markdown('</div>', unsafe_allow_html=True)
 # -------------------------
 # Data Filtering (always runs)
 # -------------------------
-df_filtered = df_all.copy()
-if st.session_state.state: df_filtered = df_filtered[df_filtered["STATE_UT"] == st.session_state.state]
-if st.session_state.district: df_filtered = df_filtered[df_filtered["DISTRICT"] == st.session_state.district]
-if st.session_state.block: df_filtered = df_filtered[df_filtered["BLOCK"] == st.session_state.block]
-if st.session_state.village: df_filtered = df_filtered[df_filtered["VILLAGE"] == st.session_state.village]
-if st.session_state.pincode: df_filtered = df_filtered[df_filtered["PINCODE"] == st.session_state.pincode]
-if manual_location:
-    q = manual_location.lower()
-    df_filtered = df_filtered[df_filtered.apply(lambda row: q in str(row).lower(), axis=1)]
+selection = [st.session_state.state, st.session_state.district, st.session_state.block, st.session_state.village, st.session_state.pincode]
+with profiler.span("manual_search" if manual_location else "filter"):
+    df_filtered = engine.rows(selection, manual_location)
+profiler.count("rows_selected", len(df_filtered))
+if manual_location and df_filtered.empty:
+    with profiler.span("suggest"):
+        suggestions = engine.suggest(manual_location)
+    if suggestions: st.sidebar.caption("Did you mean: " + ", ".join(suggestions) + "?")
+with profiler.span("season_year_stats"):
+    selection_stats = engine.stats(selection, manual_location, rows=df_filtered)
+with profiler.span("latest_wells"):
+    selection_wells = engine.latest_wells(selection, manual_location)
+
+def selection_trends() -> pd.DataFrame:
+    """Per-well trends for the selection, looked up only by the views that draw them."""
+    with profiler.span("well_trends"):
+        return engine.well_trends(selection, manual_location)
 
 # -------------------------
 # --- PAGE 1: HOME PAGE ---
 # -------------------------
-def render_home_page(df):
+def render_home_page(df, stats, wells, load_trends):
     st.markdown("""
     <div class="main-title-container">
         <h1>💧 Groundwater Resource Evaluation Dashboard</h1>
@@ -218,12 +212,14 @@ def render_home_page(df):
     location_name = " -> ".join(filter(None, [st.session_state.get('state'), st.session_state.get('district'), st.session_state.get('block'), st.session_state.get('village')])) or "All India"
     st.subheader(f"📍 Currently Showing Data For: `{location_name}`")
     
+    # Weather is fetched in the background while the KPIs render
+    weather_future = get_weather_client().fetch_async(st.session_state.district, st.session_state.state)
+
     # KPIs Section
     st.subheader("📊 Key Performance Indicators")
-    avg_dtwl = df["DTWL"].mean()
-    current_dtwl = df.sort_values("DATE").iloc[-1]["DTWL"]
-    prem_avg = df[df["SEASON"]=="Premonsoon"]["DTWL"].mean()
-    post_avg = df[df["SEASON"]=="Postmonsoon"]["DTWL"].mean()
+    with profiler.span("kpis"):
+        kpi = dwlr_cube.kpis(stats)
+    avg_dtwl, current_dtwl, prem_avg, post_avg = kpi["avg_dtwl"], kpi["current_dtwl"], kpi["prem_avg"], kpi["post_avg"]
     kpi_cols = st.columns(4)
     kpi_cols[0].markdown(f'<div class="kpi-card"><div class="kpi-icon">📉</div><div class="kpi-title">Overall DTWL</div><div class="kpi-value">{avg_dtwl:.2f} m</div></div>', unsafe_allow_html=True)
     kpi_cols[1].markdown(f'<div class="kpi-card"><div class="kpi-icon">💧</div><div class="kpi-title">Current DTWL</div><div class="kpi-value">{current_dtwl:.2f} m</div></div>', unsafe_allow_html=True)
@@ -232,13 +228,12 @@ def render_home_page(df):
     st.markdown("<br>", unsafe_allow_html=True)
 
     # Weather info
-    try:
-        location = f"{st.session_state.district},{st.session_state.state},IN" if st.session_state.district else f"{st.session_state.state},IN"
-        url = f"http://api.openweathermap.org/data/2.5/weather?q={location}&appid={OPENWEATHER_API_KEY}&units=metric"
-        res = requests.get(url).json()
-        weather_temp, weather_hum = res["main"]["temp"], res["main"]["humidity"]
-    except:
-        weather_temp, weather_hum = None, None
+    with profiler.span("weather_wait"):
+        try:
+            weather = weather_future.result(timeout=WEATHER_WAIT_SECONDS)
+        except FutureTimeoutError:
+            weather = None
+    weather_temp, weather_hum = (weather["temp"], weather["humidity"]) if weather else (None, None)
     
     if weather_temp is not None:
         weather_cols = st.columns(3)
@@ -262,8 +257,7 @@ def render_home_page(df):
             else: st.error("Weather or water level data unavailable.")
     
     with action_cols[1]:
-        # --- CORRECTED DOWNLOAD LOGIC ---
-        summary_header = "Metric,Value\n"
+        # Reports are only built when asked for, streamed to disk and reused for the same selection
         summary_rows = [
             f"Location - State,{st.session_state.state or 'N/A'}",
             f"Location - District,{st.session_state.district or 'N/A'}",
@@ -275,10 +269,17 @@ def render_home_page(df):
             f"Predicted Soil Type,\"{st.session_state.soil_type}\"",
             f"Recommended Crops,\"{st.session_state.recommended_crops}\"",
         ]
-        summary_string = summary_header + "\n".join(summary_rows)
-        raw_data_string = df.to_csv(index=False)
-        final_csv_string = summary_string + "\n\n--- RAW DATA ---\n\n" + raw_data_string
-        st.download_button(label="📂 Download Full Report", data=final_csv_string.encode("utf-8"), file_name="groundwater_report.csv", mime="text/csv")
+        export_format = st.selectbox("Report format", list(dwlr_export.EXPORT_FORMATS), key="export_format")
+        report_request = (tuple(str(v) for v in selection), manual_location, tuple(summary_rows), export_format)
+        if st.button("📝 Prepare Full Report"):
+            with st.spinner("Building report..."), profiler.span("report_export"):
+                filter_key = (dwlr_store.data_fingerprint(),) + report_request[:2]
+                st.session_state.report = (report_request, get_report_exporter().export(df, summary_rows, export_format, filter_key))
+        prepared = st.session_state.get("report")
+        if prepared and prepared[0] == report_request and os.path.exists(prepared[1]):
+            fmt = dwlr_export.EXPORT_FORMATS[export_format]
+            with open(prepared[1], "rb") as fh:
+                st.download_button(label="📂 Download Full Report", data=fh, file_name="groundwater_report" + fmt["suffix"], mime=fmt["mime"])
 
     if st.session_state.recommended_crops:
         st.markdown(f"<div class='result-box'><strong>Recommended Crops:</strong> {st.session_state.recommended_crops}</div>", unsafe_allow_html=True)
@@ -293,34 +294,53 @@ def render_home_page(df):
 
     st.markdown("---")
     st.header("📊 Overall Trend Analysis & Location Map")
-    df_plot = df.copy()
-    if "DATE" in df_plot.columns:
-        df_plot["YEAR"] = df_plot["DATE"].dt.year
-        prem = df_plot[df_plot["SEASON"]=="Premonsoon"].groupby("YEAR")["DTWL"].mean().reset_index()
-        post = df_plot[df_plot["SEASON"]=="Postmonsoon"].groupby("YEAR")["DTWL"].mean().reset_index()
-        overall = df_plot[df_plot.SEASON.isin(["Premonsoon", "Postmonsoon"])].groupby("YEAR")["DTWL"].mean().reset_index()
-        if not (prem.empty and post.empty):
-            prem['Trend'], post['Trend'], overall['Trend'] = 'Premonsoon', 'Postmonsoon', 'Overall'
-            df_combined = pd.concat([prem, post, overall], ignore_index=True)
-            fig_combined = px.line(df_combined, x="YEAR", y="DTWL", color='Trend', markers=True, 
-                                   title="Combined Groundwater Level Trends", labels={"DTWL": "Depth to Water Level DTWL (m)", "YEAR": "Year"})
-            st.plotly_chart(fig_combined, use_container_width=True)
+    if "DATE" in df.columns:
+        with profiler.span("trend_charts"):
+            prem = dwlr_cube.seasonal_trend(stats, "Premonsoon")
+            post = dwlr_cube.seasonal_trend(stats, "Postmonsoon")
+            overall = dwlr_cube.seasonal_trend(stats)
+            if not (prem.empty and post.empty):
+                prem['Trend'], post['Trend'], overall['Trend'] = 'Premonsoon', 'Postmonsoon', 'Overall'
+                df_combined = pd.concat([prem, post, overall], ignore_index=True)
+                fig_combined = px.line(df_combined, x="YEAR", y="DTWL", color='Trend', markers=True, 
+                                       title="Combined Groundwater Level Trends", labels={"DTWL": "Depth to Water Level DTWL (m)", "YEAR": "Year"})
+                st.plotly_chart(fig_combined, use_container_width=True)
     
-    if "LATITUDE" in df.columns and "LONGITUDE" in df.columns:
-        loc_latest = df.dropna(subset=["LATITUDE", "LONGITUDE"]).sort_values("DATE").groupby(["STATE_UT","DISTRICT","BLOCK","VILLAGE"]).tail(1)
-        if not loc_latest.empty:
-            st.markdown("<br>", unsafe_allow_html=True)
-            st.header("📍 Location Map")
-            fig_map = px.scatter_mapbox(loc_latest, lat="LATITUDE", lon="LONGITUDE", hover_name="VILLAGE", hover_data=["DTWL"],
-                                        color="DTWL", size="DTWL", size_max=12, zoom=4, mapbox_style="open-street-map",
-                                        color_continuous_scale=px.colors.sequential.Viridis_r)
+    if wells is not None and not wells.empty:
+        st.markdown("<br>", unsafe_allow_html=True)
+        st.header("📍 Location Map")
+        # Wells are coloured by latest DTWL or by their precomputed long-term trend (Sen's slope, m/yr)
+        colour_by = st.radio("Colour wells by", ["Latest DTWL", "Long-term trend (m/yr)"], horizontal=True, key="map_colour")
+        if colour_by == "Latest DTWL":
+            value, colour = "DTWL", dict(color_continuous_scale=px.colors.sequential.Viridis_r)
+        else:
+            wells = load_trends().dropna(subset=["LATITUDE", "LONGITUDE", "SEN_SLOPE"])
+            value, colour = "SEN_SLOPE", dict(color_continuous_scale=px.colors.diverging.RdYlBu_r, color_continuous_midpoint=0)
+        labels = {"SEN_SLOPE": "Trend (m/yr)"}
+        if wells.empty:
+            st.info("No well in this selection has enough years of readings for a trend.")
+            return
+        with profiler.span("map"):
+            # Large selections are drawn as grid clusters (mean value) so the map payload stays bounded
+            viewport = dwlr_map.fit_viewport(wells)
+            points, clustered = dwlr_map.map_layer(wells, viewport["zoom"], value=value)
+            profiler.count("map_points", len(points))
+            if clustered:
+                st.caption(f"Showing {len(wells):,} wells as {len(points):,} clusters; zoom into a district to see individual wells.")
+                fig_map = px.scatter_mapbox(points, lat="LATITUDE", lon="LONGITUDE", hover_data=[value, "WELLS"], labels=labels,
+                                            color=value, size="WELLS", size_max=18, mapbox_style="open-street-map", **colour, **viewport)
+            else:
+                hover = [value, "TREND"] if value == "SEN_SLOPE" else [value]
+                fig_map = px.scatter_mapbox(points, lat="LATITUDE", lon="LONGITUDE", hover_name="VILLAGE", hover_data=hover, labels=labels,
+                                            color=value, size="DTWL" if value == "DTWL" else None, size_max=12,
+                                            mapbox_style="open-street-map", **colour, **viewport)
             fig_map.update_layout(margin=dict(t=0,b=0,l=0,r=0), height=500)
             st.plotly_chart(fig_map, use_container_width=True)
 
 # -------------------------
 # --- PAGE 2: REPORT PAGE ---
 # -------------------------
-def render_report_page(df):
+def render_report_page(df, stats, load_trends):
     location_name = " -> ".join(filter(None, [st.session_state.get('state'), st.session_state.get('district'), st.session_state.get('block'), st.session_state.get('village')])) or "All India"
     st.markdown(f"## 📋 Detailed Trend Report for: `{location_name}`")
     if st.button("⬅️ Back to Home"):
@@ -331,25 +351,52 @@ def render_report_page(df):
         st.warning("No data available to generate a detailed report.")
         return
 
-    df_plot = df.copy()
-    df_plot["YEAR"] = df_plot["DATE"].dt.year
-    prem = df_plot[df_plot["SEASON"]=="Premonsoon"].groupby("YEAR")["DTWL"].mean().reset_index()
-    post = df_plot[df_plot["SEASON"]=="Postmonsoon"].groupby("YEAR")["DTWL"].mean().reset_index()
-    overall = df_plot[df_plot.SEASON.isin(["Premonsoon", "Postmonsoon"])].groupby("YEAR")["DTWL"].mean().reset_index()
-    y_axis_label = {"DTWL": "Depth to Water Level DTWL (m)", "YEAR": "Year"}
+    with profiler.span("trend_charts"):
+        prem = dwlr_cube.seasonal_trend(stats, "Premonsoon")
+        post = dwlr_cube.seasonal_trend(stats, "Postmonsoon")
+        overall = dwlr_cube.seasonal_trend(stats)
+        y_axis_label = {"DTWL": "Depth to Water Level DTWL (m)", "YEAR": "Year"}
+
+        if not prem.empty:
+            st.subheader("☀️ Premonsoon DTWL Trend")
+            fig_prem = px.line(prem, x="YEAR", y="DTWL", markers=True, title="Premonsoon DTWL Trend", labels=y_axis_label)
+            st.plotly_chart(fig_prem, use_container_width=True)
+        if not post.empty:
+            st.subheader("🌧️ Postmonsoon DTWL Trend")
+            fig_post = px.line(post, x="YEAR", y="DTWL", markers=True, title="Postmonsoon DTWL Trend", labels=y_axis_label)
+            st.plotly_chart(fig_post, use_container_width=True)
+        if not overall.empty:
+            st.subheader("📉 Overall DTWL Trend")
+            fig_overall = px.line(overall, x="YEAR", y="DTWL", markers=True, title="Overall DTWL Trend", labels=y_axis_label)
+            st.plotly_chart(fig_overall, use_container_width=True)
+
+    # Per-well statistics come precomputed for every well, so ranking is a sort on the selection's rows
+    trends = load_trends()
+    rated = trends[trends["TREND"] != "Insufficient data"] if not trends.empty else trends
+    if not rated.empty:
+        st.subheader("🧭 Well Trends & Sudden Drops")
+        st.caption(f"Sen's slope and Mann-Kendall significance (p < {dwlr_analytics.SIGNIFICANCE}) of annual mean DTWL per well; "
+                   "a positive slope means the water table is falling. Sudden drops are year-over-year increases in DTWL "
+                   f"with a robust z-score above {dwlr_analytics.DROP_Z_THRESHOLD}.")
+        trend_counts = rated["TREND"].value_counts()
+        trend_cols = st.columns(4)
+        trend_cols[0].metric("Wells analysed", f"{len(rated):,}")
+        trend_cols[1].metric("Declining", f"{trend_counts.get('Declining', 0):,}")
+        trend_cols[2].metric("Rising", f"{trend_counts.get('Rising', 0):,}")
+        trend_cols[3].metric("Sudden drops", f"{int(rated['SUDDEN_DROP'].sum()):,}")
 
-    if not prem.empty:
-        st.subheader("☀️ Premonsoon DTWL Trend")
-        fig_prem = px.line(prem, x="YEAR", y="DTWL", markers=True, title="Premonsoon DTWL Trend", labels=y_axis_label)
-        st.plotly_chart(fig_prem, use_container_width=True)
-    if not post.empty:
-        st.subheader("🌧️ Postmonsoon DTWL Trend")
-        fig_post = px.line(post, x="YEAR", y="DTWL", markers=True, title="Postmonsoon DTWL Trend", labels=y_axis_label)
-        st.plotly_chart(fig_post, use_container_width=True)
-    if not overall.empty:
-        st.subheader("📉 Overall DTWL Trend")
-        fig_overall = px.line(overall, x="YEAR", y="DTWL", markers=True, title="Overall DTWL Trend", labels=y_axis_label)
-        st.plotly_chart(fig_overall, use_container_width=True)
+        with profiler.span("well_ranking"):
+            ranked = rated.nlargest(TOP_WELLS, "SEN_SLOPE").assign(WELL=lambda t: t["VILLAGE"].astype(str) + ", " + t["BLOCK"].astype(str))
+            fig_rank = px.bar(ranked, x="SEN_SLOPE", y="WELL", color="TREND", orientation="h", title=f"Fastest-Declining Wells (top {len(ranked)})",
+                              color_discrete_map=TREND_COLOURS, labels={"SEN_SLOPE": "Trend (m/yr)", "WELL": "Well"})
+            fig_rank.update_layout(yaxis={"categoryorder": "total ascending"}, height=max(300, 22 * len(ranked)))
+            st.plotly_chart(fig_rank, use_container_width=True)
+
+        drops = rated[rated["SUDDEN_DROP"]].sort_values("DROP_Z", ascending=False)
+        if not drops.empty:
+            st.markdown("**Wells with sudden drops**")
+            st.dataframe(drops[WELL_TABLE_COLUMNS], hide_index=True, use_container_width=True,
+                         column_config={"DROP_YEAR": st.column_config.NumberColumn("Drop year", format="%d")})
 
 # -------------------------
 # --- MAIN APP ROUTER ---
@@ -358,6 +405,30 @@ if df_filtered.empty:
     st.warning("No data found for the selected filters. Please clear the filters or choose another location.")
 else:
     if st.session_state.page == 'home':
-        render_home_page(df_filtered)
+        with profiler.span("render_home_page"):
+            render_home_page(df_filtered, selection_stats, selection_wells, selection_trends)
     elif st.session_state.page == 'report':
-        render_report_page(df_filtered)
+        with profiler.span("render_report_page"):
+            render_report_page(df_filtered, selection_stats, selection_trends)
+
+# -------------------------
+# --- PROFILING PANEL (DWLR_PROFILE=1) ---
+# -------------------------
+def render_profiling_panel(profiler):
+    # The finished rerun is logged as one JSON record and kept in the session for export
+    record = profiler.log(location=[str(v) for v in selection], manual_location=manual_location)
+    runs = st.session_state.setdefault("profile_runs", [])
+    runs.append(record)
+    del runs[:-PROFILE_HISTORY]
+    with st.sidebar.expander("⏱️ Profiling", expanded=False):
+        st.caption(f"Last rerun: {record['total_ms']:.0f} ms ({len(runs)} runs logged this session)")
+        spans = pd.DataFrame([{"Stage": "· " * s["depth"] + s["name"], "ms": s["ms"]} for s in record["spans"]])
+        if not spans.empty: st.dataframe(spans, hide_index=True, use_container_width=True)
+        if record["counters"]: st.json(record["counters"], expanded=False)
+        caches = {**record["caches"], "weather (client)": get_weather_client().stats(), "report export (disk)": get_report_exporter().counters}
+        st.dataframe(pd.DataFrame(caches).T[["hits", "misses"]], use_container_width=True)
+        st.download_button("Export profiling log", "\n".join(json.dumps(r, default=str) for r in runs),
+                           file_name="dwlr_profile.jsonl", mime="application/x-ndjson")
+
+if profiler.enabled:
+    render_profiling_panel(profiler)
@@ -0,0 +1,163 @@
+import functools
+import math
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from dwlr_index import LocationIndex, LocationSearch, sort_by_location
+from dwlr_map import WELL_KEYS
+from dwlr_store import DerivedTable
+
+# -------------------------
+# Per-Well Trend & Anomaly Statistics
+# -------------------------
+# DTWL is a depth, so a positive slope means the water table is falling ("Declining").
+MIN_YEARS = 5            # annual means needed before a trend or anomaly is reported
+SIGNIFICANCE = 0.05      # two-sided Mann-Kendall p-value
+DROP_Z_THRESHOLD = 3.5   # robust z of a year-over-year DTWL increase flagged as a sudden drop
+CHUNK_WELLS = 4096       # wells per block of the pairwise (wells x year pairs) Sen/Mann-Kendall arrays
+TREND_LABELS = ["Declining", "Rising", "No trend", "Insufficient data"]
+ANALYTICS_DIR_NAME = "analytics"
+
+_erfc = np.frompyfunc(math.erfc, 1, 1)
+
+
+def _well_matrix(ids: np.ndarray, cols: np.ndarray, values: np.ndarray, mask: np.ndarray, shape: tuple) -> np.ndarray:
+    """Mean of values per (well, year) cell as a dense wells x years matrix, NaN where there are no readings."""
+    flat = ids[mask] * shape[1] + cols[mask]
+    total = np.bincount(flat, weights=values[mask], minlength=shape[0] * shape[1])
+    count = np.bincount(flat, minlength=shape[0] * shape[1])
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return (total / count).reshape(shape)
+
+def _per_well_mean(ids: np.ndarray, values: np.ndarray, n_wells: int) -> np.ndarray:
+    valid = ~np.isnan(values)
+    total = np.bincount(ids[valid], weights=values[valid], minlength=n_wells)
+    count = np.bincount(ids[valid], minlength=n_wells)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return total / count
+
+def sen_mann_kendall(annual: np.ndarray) -> tuple:
+    """Sen's slope (per year) and Mann-Kendall S, z and two-sided p for every row of a wells x years matrix.
+
+    Missing years are skipped pairwise; the variance uses the no-ties normal approximation.
+    """
+    n_wells, n_years = annual.shape
+    i, j = np.triu_indices(n_years, 1)
+    slope, s = np.full(n_wells, np.nan), np.zeros(n_wells)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN rows
+        for start in range(0, n_wells, CHUNK_WELLS):
+            block = annual[start:start + CHUNK_WELLS]
+            diffs = block[:, j] - block[:, i]
+            slope[start:start + CHUNK_WELLS] = np.nanmedian(diffs / (j - i), axis=1)
+            s[start:start + CHUNK_WELLS] = np.nansum(np.sign(diffs), axis=1)
+    n = np.isfinite(annual).sum(axis=1).astype(np.float64)
+    var = n * (n - 1) * (2 * n + 5) / 18
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(var > 0, (s - np.sign(s)) / np.sqrt(var), np.nan)
+    p = _erfc(np.abs(z) / math.sqrt(2)).astype(np.float64)
+    return slope, s, z, p
+
+def sudden_drops(annual: np.ndarray) -> tuple:
+    """Largest robust z (median/MAD) of year-over-year DTWL changes per well, and the column it ends in."""
+    diffs = annual[:, 1:] - annual[:, :-1]
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        median = np.nanmedian(diffs, axis=1, keepdims=True)
+        mad = np.nanmedian(np.abs(diffs - median), axis=1, keepdims=True)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        z = np.where(mad > 0, 0.6745 * (diffs - median) / mad, np.nan)
+    z[np.isfinite(diffs).sum(axis=1) < MIN_YEARS - 1] = np.nan
+    if not z.shape[1]: return np.full(len(z), np.nan), np.zeros(len(z), dtype=np.int64)
+    column = np.argmax(np.where(np.isnan(z), -np.inf, z), axis=1)
+    return z[np.arange(len(z)), column], column + 1
+
+def well_trends(df: pd.DataFrame) -> pd.DataFrame:
+    """One row per well with its long-term trend, seasonal amplitude and sudden-drop flag, sorted by location.
+
+    All wells are processed together on wells x years matrices of annual mean DTWL.
+    """
+    columns = [c for c in WELL_KEYS + ["PINCODE", "LATITUDE", "LONGITUDE"] if c in df.columns]
+    ids = df.groupby(WELL_KEYS, observed=True, sort=False).ngroup().to_numpy()
+    keep = ~np.isnan(ids)
+    if not keep.any(): return pd.DataFrame(columns=columns)
+    ids = ids[keep].astype(np.int64)
+    n_wells = int(ids.max()) + 1
+    year = df["YEAR"].to_numpy()[keep].astype(np.int64)
+    first_year = int(year.min())
+    years = np.arange(first_year, int(year.max()) + 1)
+    cols = year - first_year
+    dtwl = df["DTWL"].to_numpy(np.float64)[keep]
+    season = df["SEASON"].to_numpy()[keep]
+    shape = (n_wells, len(years))
+
+    everything = np.ones(len(ids), dtype=bool)
+    annual = _well_matrix(ids, cols, dtwl, everything, shape)
+    pre = _well_matrix(ids, cols, dtwl, season == "Premonsoon", shape)
+    post = _well_matrix(ids, cols, dtwl, season == "Postmonsoon", shape)
+
+    first_row = np.unique(ids, return_index=True)[1]
+    trends = df.loc[keep, columns].iloc[first_row].reset_index(drop=True)
+    for col in ("LATITUDE", "LONGITUDE"):
+        if col in trends.columns: trends[col] = _per_well_mean(ids, df[col].to_numpy(np.float64)[keep], n_wells)
+
+    observed = np.isfinite(annual)
+    n_years = observed.sum(axis=1)
+    slope, s, z, p = sen_mann_kendall(annual)
+    drop_z, drop_col = sudden_drops(annual)
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)
+        trends["MEAN_DTWL"] = np.nanmean(annual, axis=1)
+        trends["AMPLITUDE"] = np.nanmean(pre - post, axis=1)
+    trends["YEARS"] = n_years.astype(np.int16)
+    trends["FIRST_YEAR"] = years[np.argmax(observed, axis=1)].astype(np.int16)
+    trends["LAST_YEAR"] = years[len(years) - 1 - np.argmax(observed[:, ::-1], axis=1)].astype(np.int16)
+    enough = n_years >= MIN_YEARS
+    trends["SEN_SLOPE"] = np.where(enough, slope, np.nan)
+    trends["MK_S"] = s
+    trends["MK_Z"] = z
+    trends["MK_P"] = p
+    significant = enough & (p < SIGNIFICANCE)
+    trends["TREND"] = pd.Categorical(np.select([~enough, significant & (slope > 0), significant & (slope < 0)],
+                                               ["Insufficient data", "Declining", "Rising"], "No trend"), categories=TREND_LABELS)
+    trends["DROP_Z"] = drop_z
+    trends["DROP_YEAR"] = np.where(np.isnan(drop_z), np.nan, years[drop_col])
+    trends["SUDDEN_DROP"] = np.nan_to_num(drop_z, nan=-np.inf) > DROP_Z_THRESHOLD
+    return sort_by_location(trends)
+
+
+# -------------------------
+# Precomputed Well Trends Table
+# -------------------------
+class WellTrends(DerivedTable):
+    """Per-well trend table with its own location index, rebuilt when the store's partitions change."""
+    NAME = ANALYTICS_DIR_NAME
+
+    def __init__(self, trends: pd.DataFrame):
+        self.trends = trends
+        self.index = LocationIndex(trends)
+        self.covers = []  # store partitions this table was computed from
+
+    @functools.cached_property
+    def search(self) -> LocationSearch:
+        return LocationSearch(self.index)
+
+    def select(self, selection, query: str = "") -> pd.DataFrame:
+        if query: return self.search.select(self.trends, query, selection)
+        return self.index.select(self.trends, selection)
+
+    @classmethod
+    def build(cls, df: pd.DataFrame):
+        return cls(well_trends(df))
+
+    def frames(self) -> dict:
+        return {"well_trends": self.trends}
+
+    @classmethod
+    def from_frames(cls, frames: dict, meta: dict):
+        return cls(frames["well_trends"])
+
+
+load_or_build = WellTrends.load_or_build
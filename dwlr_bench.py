@@ -0,0 +1,191 @@
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import numpy as np
+
+import dwlr_analytics
+import dwlr_cube
+import dwlr_export
+import dwlr_index
+import dwlr_map
+import dwlr_store
+from dwlr_synthetic import iter_readings
+
+XLSX_MAX_ROWS = 200_000  # up to this, half of every chunk becomes an XLSX source; above it CSV only (openpyxl is slow)
+
+
+# -------------------------
+# Stage Timing & Memory
+# -------------------------
+class Bench:
+    """Accumulates wall time, operation count and peak traced allocation per named stage."""
+
+    def __init__(self, trace_memory: bool = True):
+        self.trace_memory = trace_memory
+        self.stages = {}
+
+    @contextmanager
+    def stage(self, name: str, ops: int = 1):
+        if self.trace_memory:
+            base = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            result = self.stages.setdefault(name, {"seconds": 0.0, "ops": 0, "peak_mib": 0.0})
+            result["seconds"] += elapsed
+            result["ops"] += ops
+            if self.trace_memory:
+                peak = (tracemalloc.get_traced_memory()[1] - base) / 2**20
+                result["peak_mib"] = max(result["peak_mib"], round(peak, 2))
+
+    def report(self) -> str:
+        lines = [f"{'stage':<32}{'ops':>7}{'total s':>11}{'per op ms':>12}{'peak MiB':>11}"]
+        for name, r in self.stages.items():
+            per_op = 1000 * r["seconds"] / r["ops"] if r["ops"] else 0.0
+            lines.append(f"{name:<32}{r['ops']:>7}{r['seconds']:>11.3f}{per_op:>12.2f}{r['peak_mib']:>11.1f}")
+        return "\n".join(lines)
+
+
+def _git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=dwlr_store.APP_DIR,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+def _write_source(chunk, path: str):
+    # Laid out like the real source files: dd-mm-yyyy dates in CSVs, native dates in XLSX.
+    if path.endswith(".xlsx"): chunk.to_excel(path, index=False)
+    else: chunk.to_csv(path, index=False, date_format="%d-%m-%Y")
+
+def _sample_selections(df, rng, samples: int) -> list:
+    """Random hierarchical selections (state down to village) taken from real rows."""
+    levels = dwlr_index.LOCATION_LEVELS[:4]
+    rows = df.iloc[rng.integers(0, len(df), samples)][levels].to_numpy()
+    depths = rng.integers(1, len(levels) + 1, samples)
+    return [list(row[:depth]) + [""] * (len(dwlr_index.LOCATION_LEVELS) - depth) for row, depth in zip(rows, depths)]
+
+def _sample_queries(search, rng, samples: int) -> list:
+    names = [search.names[i] for i in rng.integers(0, len(search.names), samples)]
+    return [n[s:s + 4] if len(n) > 4 else n for n, s in zip(names, rng.integers(0, 4, samples))]
+
+
+# -------------------------
+# Benchmark Run
+# -------------------------
+def run(rows: int, chunk_rows: int = 1_000_000, samples: int = 200, seed: int = 0, store_dir: str = None, trace_memory: bool = True,
+        cold_start: bool = True) -> dict:
+    """Times every hot path of the dashboard on synthetic data, headless (no Streamlit, no network).
+
+    With cold_start, the chunks are also written out as CSV (and XLSX at small scales) source files
+    and build_store is timed on them, i.e. the parse-everything first start of the dashboard.
+    """
+    own_store = store_dir is None
+    store_dir = store_dir or tempfile.mkdtemp(prefix="dwlr-bench-")
+    cold_dir = tempfile.mkdtemp(prefix="dwlr-bench-cold-") if cold_start else None
+    bench = Bench(trace_memory)
+    rng = np.random.default_rng(seed)
+    if trace_memory: tracemalloc.start()
+    try:
+        chunks = iter_readings(rows, chunk_rows=chunk_rows, seed=seed)
+        sources = []
+        while True:
+            with bench.stage("generate"):
+                chunk = next(chunks, None)
+            if chunk is None: break
+            with bench.stage("ingest (clean+compact+write+fold)"):
+                dwlr_store.ingest_batch(chunk, store_dir)
+            if cold_start:
+                half = len(chunk) // 2
+                parts = [("csv", chunk)] if rows > XLSX_MAX_ROWS else [("csv", chunk.iloc[:half]), ("xlsx", chunk.iloc[half:])]
+                with bench.stage("write sources (csv/xlsx)"):
+                    for ext, part in parts:
+                        sources.append(f"synthetic-{len(sources):04d}.{ext}")
+                        _write_source(part, os.path.join(cold_dir, sources[-1]))
+            del chunk
+
+        cold = None
+        if cold_start:
+            # Parsing runs in build_store's worker processes when there is more than one CPU; tracemalloc
+            # then only sees the parent's share of this stage.
+            with bench.stage("build_store (cold, csv/xlsx)"):
+                issues = dwlr_store.build_store(os.path.join(cold_dir, "store"), sources=sources, source_dir=cold_dir)
+            if issues: raise RuntimeError("; ".join(issues))
+            cold = dwlr_store.read_manifest(os.path.join(cold_dir, "store"))["last_build"]
+
+        with bench.stage("load_all_data"):
+            df = dwlr_index.sort_by_location(dwlr_store.load_store(store_dir))
+        with bench.stage("aggregate_cube"):
+            cube = dwlr_cube.load_or_build(df, store_dir)
+        with bench.stage("precompute_unique_values"):
+            cube.location_uniques()
+        with bench.stage("location_index"):
+            index = dwlr_index.LocationIndex(df)
+        with bench.stage("search_index"):
+            search = dwlr_index.LocationSearch(index)
+        with bench.stage("latest_wells"):
+            wells = dwlr_map.load_or_build(df, store_dir)
+        with bench.stage("well_trends"):
+            trends = dwlr_analytics.load_or_build(df, store_dir)
+
+        selections = _sample_selections(df, rng, samples)
+        queries = _sample_queries(search, rng, samples)
+        with bench.stage("filter", ops=samples):
+            for selection in selections: index.select(df, selection)
+        with bench.stage("manual_search", ops=samples):
+            for query in queries: search.select(df, query)
+        with bench.stage("kpis+trends", ops=samples):
+            for selection in selections:
+                stats = cube.stats(selection)
+                dwlr_cube.kpis(stats)
+                for season in ("Premonsoon", "Postmonsoon", None): dwlr_cube.seasonal_trend(stats, season)
+        with bench.stage("map_layer", ops=samples):
+            for selection in selections:
+                selected = wells.select(selection)
+                if not selected.empty: dwlr_map.map_layer(selected, dwlr_map.fit_viewport(selected)["zoom"])
+
+        with bench.stage("well_ranking", ops=samples):
+            for selection in selections: trends.select(selection).nlargest(15, "SEN_SLOPE")
+
+        state = df["STATE_UT"].value_counts().index[0]
+        df_state = index.select(df, [state])
+        with bench.stage("report_export (largest state)"):
+            dwlr_export.write_report(df_state, [f"Location - State,{state}"], "CSV (gzip)", os.path.join(store_dir, "bench-report.csv.gz"))
+
+        return {"commit": _git_commit(), "rows": len(df), "wells": len(wells.wells), "stages": bench.stages, "cold_start": cold,
+                "max_rss_mib": round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1), "report": bench.report()}
+    finally:
+        if trace_memory: tracemalloc.stop()
+        if own_store: shutil.rmtree(store_dir, ignore_errors=True)
+        if cold_dir: shutil.rmtree(cold_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the dashboard's hot paths on synthetic DWLR data.")
+    parser.add_argument("--rows", type=float, default=1e5, help="synthetic readings to generate (1e5 .. 1e8)")
+    parser.add_argument("--chunk-rows", type=float, default=1e6, help="rows generated and ingested per batch")
+    parser.add_argument("--samples", type=int, default=200, help="random selections/queries per interactive stage")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--no-trace-memory", action="store_true", help="skip tracemalloc (faster, no per-stage peaks)")
+    parser.add_argument("--no-cold-start", action="store_true", help="skip writing CSV/XLSX sources and timing build_store on them")
+    parser.add_argument("--json", metavar="PATH", help="also write results as JSON for comparing commits")
+    args = parser.parse_args()
+
+    results = run(int(args.rows), int(args.chunk_rows), args.samples, args.seed, trace_memory=not args.no_trace_memory,
+                  cold_start=not args.no_cold_start)
+    print(f"commit {results['commit']} | {results['rows']:,} rows | {results['wells']:,} wells | max RSS {results['max_rss_mib']} MiB")
+    print(results.pop("report"))
+    if args.json:
+        with open(args.json, "w") as fh:
+            json.dump(results, fh, indent=2)
@@ -0,0 +1,131 @@
+import numpy as np
+import pandas as pd
+
+from dwlr_index import LOCATION_LEVELS, is_set, split_selection
+from dwlr_store import DerivedTable
+
+# -------------------------
+# Seasonal / Yearly DTWL Aggregates
+# -------------------------
+STAT_COLUMNS = ["SUM", "COUNT", "MIN", "MAX", "LATEST_DATE", "LATEST_DTWL"]
+TREND_SEASONS = ["Premonsoon", "Postmonsoon"]
+UNIQUE_KEYS = ["districts_by_state", "blocks_by_district", "villages_by_block", "pincodes_by_village"]
+CUBE_DIR_NAME = "cube"
+
+
+def season_year_stats(df: pd.DataFrame, by=()) -> pd.DataFrame:
+    """One row per (*by, SEASON, YEAR) with DTWL sum/count/min/max and the latest reading."""
+    keys = list(by) + ["SEASON", "YEAR"]
+    if df.empty:
+        return pd.DataFrame(columns=STAT_COLUMNS, index=pd.MultiIndex.from_tuples([], names=keys))
+    # Positional index: idxmax labels below are used to index numpy arrays, and df may be a slice.
+    frame = df[keys].reset_index(drop=True)
+    frame["DTWL"] = df["DTWL"].to_numpy(np.float64)
+    frame["DATE"] = df["DATE"].to_numpy()
+    grouped = frame.groupby(keys, observed=True, dropna=False, sort=True)
+    stats = grouped["DTWL"].agg(SUM="sum", COUNT="count", MIN="min", MAX="max")
+    # The latest reading is the one with the max DATE, ties going to the max DTWL (same rule as merge_stats).
+    at_latest = frame[frame["DATE"].to_numpy() == grouped["DATE"].transform("max").to_numpy()]
+    latest = at_latest.groupby(keys, observed=True, dropna=False, sort=True)["DTWL"].idxmax()
+    stats["LATEST_DATE"] = frame["DATE"].to_numpy()[latest.to_numpy()]
+    stats["LATEST_DTWL"] = frame["DTWL"].to_numpy()[latest.to_numpy()]
+    return stats
+
+def merge_stats(*tables) -> pd.DataFrame:
+    """Combines stats tables over the same keys, e.g. the stored cube and the cube of a new batch."""
+    combined = pd.concat(tables).sort_values(["LATEST_DATE", "LATEST_DTWL"], kind="stable")
+    grouped = combined.groupby(level=list(range(combined.index.nlevels)), observed=True, dropna=False, sort=True)
+    return grouped.agg(SUM=("SUM", "sum"), COUNT=("COUNT", "sum"), MIN=("MIN", "min"), MAX=("MAX", "max"),
+                       LATEST_DATE=("LATEST_DATE", "last"), LATEST_DTWL=("LATEST_DTWL", "last"))
+
+
+class AggregateCube(DerivedTable):
+    """Season/year DTWL stats materialized for every location level (All India down to PINCODE)."""
+    NAME = CUBE_DIR_NAME
+
+    def __init__(self, df: pd.DataFrame = None, levels: list = None, tables: list = None):
+        self.levels = levels if df is None else [c for c in LOCATION_LEVELS if c in df.columns]
+        self.tables = tables if df is None else [season_year_stats(df, self.levels[:depth]) for depth in range(len(self.levels) + 1)]
+        self.covers = []  # store partitions folded into this cube
+
+    def update(self, batch: pd.DataFrame):
+        """Folds a batch of new rows in; cost scales with the cube and the batch, not the full history."""
+        # Levels the batch lacks become nulls, exactly as they do when the partitions are concatenated.
+        batch = batch.assign(**{col: np.nan for col in self.levels if col not in batch.columns})
+        self.tables = [merge_stats(table, season_year_stats(batch, self.levels[:depth])) for depth, table in enumerate(self.tables)]
+        return self
+
+    @classmethod
+    def build(cls, df: pd.DataFrame):
+        return cls(df)
+
+    def frames(self) -> dict:
+        return {f"cube-{depth}": table.reset_index() for depth, table in enumerate(self.tables)}
+
+    def meta(self) -> dict:
+        return {"levels": self.levels}
+
+    @classmethod
+    def from_frames(cls, frames: dict, meta: dict):
+        levels = meta["levels"]
+        return cls(levels=levels, tables=[frames[f"cube-{depth}"].set_index(levels[:depth] + ["SEASON", "YEAR"])
+                                          for depth in range(len(levels) + 1)])
+
+    def location_uniques(self) -> dict:
+        """Dropdown options per hierarchy level, read off the cube keys instead of the rows."""
+        uniques = {"states": []}
+        if self.levels:
+            uniques["states"] = sorted(v for v in self.tables[1].index.get_level_values(0).unique() if is_set(v))
+        for depth, name in enumerate(UNIQUE_KEYS, 2):
+            if depth > len(self.levels):
+                uniques[name] = {}
+                continue
+            index = self.tables[depth].index
+            pairs = pd.DataFrame({"parent": index.get_level_values(depth - 2).astype(object),
+                                  "child": index.get_level_values(depth - 1).astype(object)}).dropna().drop_duplicates()
+            uniques[name] = pairs.groupby("parent")["child"].apply(lambda x: sorted(x.unique())).to_dict()
+        return uniques
+
+    def stats(self, selection):
+        """Stats for a hierarchical selection, or None when it skips a level and needs the rows instead."""
+        prefix, residual = split_selection(selection, len(self.levels))
+        if residual: return None
+        table = self.tables[len(prefix)]
+        if not prefix: return table
+        try:
+            return table.xs(prefix, level=list(range(len(prefix))), drop_level=True)
+        except KeyError:
+            return table.iloc[0:0].droplevel(list(range(len(prefix))))
+
+
+# -------------------------
+# Roll-ups for KPIs & Trends
+# -------------------------
+def _mean(stats: pd.DataFrame) -> float:
+    count = stats["COUNT"].sum()
+    return float(stats["SUM"].sum() / count) if count else np.nan
+
+def kpis(stats: pd.DataFrame) -> dict:
+    seasons = stats.index.get_level_values("SEASON")
+    latest = stats["LATEST_DATE"].to_numpy()
+    return {
+        "avg_dtwl": _mean(stats),
+        "current_dtwl": float(stats["LATEST_DTWL"].iloc[latest.argmax()]) if len(stats) else np.nan,
+        "prem_avg": _mean(stats[seasons == "Premonsoon"]),
+        "post_avg": _mean(stats[seasons == "Postmonsoon"]),
+    }
+
+def seasonal_trend(stats: pd.DataFrame, season: str = None) -> pd.DataFrame:
+    """Yearly mean DTWL for one season, or for Premonsoon and Postmonsoon combined when season is None."""
+    seasons = stats.index.get_level_values("SEASON")
+    subset = stats[seasons == season] if season else stats[seasons.isin(TREND_SEASONS)]
+    yearly = subset.groupby(level="YEAR")[["SUM", "COUNT"]].sum()
+    yearly = yearly[yearly["COUNT"] > 0]
+    return pd.DataFrame({"YEAR": yearly.index.astype(int), "DTWL": (yearly["SUM"] / yearly["COUNT"]).to_numpy()})
+
+
+# -------------------------
+# Persistence & Incremental Updates
+# -------------------------
+load_or_build = AggregateCube.load_or_build
+apply_batch = AggregateCube.apply_batch
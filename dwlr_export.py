@@ -0,0 +1,154 @@
+import gzip
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from dwlr_store import STORE_DIR
+
+# -------------------------
+# Report Formats
+# -------------------------
+EXPORT_FORMATS = {
+    "CSV": {"suffix": ".csv", "mime": "text/csv"},
+    "CSV (gzip)": {"suffix": ".csv.gz", "mime": "application/gzip"},
+    "Parquet": {"suffix": ".parquet", "mime": "application/vnd.apache.parquet"},
+}
+EXPORT_DIR = os.path.join(STORE_DIR, "exports")
+CHUNK_ROWS = 100_000
+TMP_PREFIX = ".report-"
+STALE_TMP_SECONDS = 3600  # temp files older than this are leftovers of crashed builds
+
+
+def iter_report_csv(df: pd.DataFrame, summary_rows: list, chunk_rows: int = CHUNK_ROWS):
+    """Yields the CSV report (summary block, then raw rows) as UTF-8 chunks of at most chunk_rows rows."""
+    yield ("Metric,Value\n" + "\n".join(summary_rows) + "\n\n--- RAW DATA ---\n\n").encode("utf-8")
+    if df.empty:
+        yield df.to_csv(index=False).encode("utf-8")
+        return
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows].to_csv(index=False, header=start == 0).encode("utf-8")
+
+def write_report(df: pd.DataFrame, summary_rows: list, fmt: str, path: str, chunk_rows: int = CHUNK_ROWS):
+    """Streams the report to path chunk by chunk so no full in-memory copy of the rows is built.
+
+    Each call writes its own temp file and renames it into place, so concurrent writers never share a file.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path) or ".", prefix=TMP_PREFIX, suffix=".tmp")
+    os.close(fd)
+    try:
+        _write_report_file(df, summary_rows, fmt, tmp_path, chunk_rows)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+
+def _write_report_file(df: pd.DataFrame, summary_rows: list, fmt: str, tmp_path: str, chunk_rows: int):
+    if fmt == "Parquet":
+        # The summary block travels as file metadata; the rows are written one row group per chunk.
+        schema = pa.Schema.from_pandas(df.iloc[0:0], preserve_index=False)
+        schema = schema.with_metadata({**(schema.metadata or {}), b"dwlr_summary": json.dumps(summary_rows).encode("utf-8")})
+        with pq.ParquetWriter(tmp_path, schema, compression="zstd") as writer:
+            for start in range(0, len(df), chunk_rows):
+                chunk = df.iloc[start:start + chunk_rows]
+                writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+    else:
+        opener = gzip.open if fmt == "CSV (gzip)" else open
+        with opener(tmp_path, "wb") as fh:
+            for chunk in iter_report_csv(df, summary_rows, chunk_rows):
+                fh.write(chunk)
+
+
+# -------------------------
+# Cached Exporter
+# -------------------------
+class ReportExporter:
+    """Builds reports on demand and keeps the most recent ones on disk, keyed by filter + summary + format.
+
+    Concurrent requests for the same report share one build. Reports left in export_dir by an
+    earlier process are adopted on start (oldest first) and evicted like any other entry.
+    """
+
+    def __init__(self, export_dir: str = EXPORT_DIR, max_entries: int = 16):
+        self.export_dir = export_dir
+        self.max_entries = max_entries
+        self._paths = OrderedDict()  # cache key -> report path
+        self._inflight = {}          # cache key -> Future of the build in progress
+        self._lock = threading.Lock()
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0}
+        self._reindex()
+
+    def _reindex(self):
+        if not os.path.isdir(self.export_dir): return
+        suffixes = sorted((f["suffix"] for f in EXPORT_FORMATS.values()), key=len, reverse=True)
+        reports = []
+        for name in os.listdir(self.export_dir):
+            path = os.path.join(self.export_dir, name)
+            if name.startswith(TMP_PREFIX):
+                if time.time() - os.path.getmtime(path) > STALE_TMP_SECONDS: os.remove(path)
+                continue
+            suffix = next((sfx for sfx in suffixes if name.endswith(sfx)), None)
+            if suffix: reports.append((os.path.getmtime(path), name[:-len(suffix)], path))
+        for _, key, path in sorted(reports):
+            self._paths[key] = path
+        self._evict()
+
+    def _evict(self):
+        while len(self._paths) > self.max_entries:
+            _, stale = self._paths.popitem(last=False)
+            if os.path.exists(stale): os.remove(stale)
+
+    def cache_key(self, filter_key, summary_rows: list, fmt: str) -> str:
+        return hashlib.sha1(repr((filter_key, tuple(summary_rows), fmt)).encode("utf-8")).hexdigest()
+
+    def _cached(self, key: str):
+        path = self._paths.get(key)
+        if path and os.path.exists(path):
+            self._paths.move_to_end(key)
+            return path
+        return None
+
+    def cached(self, key: str):
+        with self._lock:
+            return self._cached(key)
+
+    def export(self, df: pd.DataFrame, summary_rows: list, fmt: str, filter_key) -> str:
+        """Returns the path of the report for this selection, writing it only on a cache miss."""
+        key = self.cache_key(filter_key, summary_rows, fmt)
+        with self._lock:
+            path = self._cached(key)
+            if path:
+                self.counters["hits"] += 1
+                return path
+            if key in self._inflight:
+                self.counters["coalesced"] += 1
+                future, owner = self._inflight[key], False
+            else:
+                self.counters["misses"] += 1
+                future, owner = Future(), True
+                self._inflight[key] = future
+        if not owner: return future.result()
+
+        try:
+            os.makedirs(self.export_dir, exist_ok=True)
+            path = os.path.join(self.export_dir, key + EXPORT_FORMATS[fmt]["suffix"])
+            write_report(df, summary_rows, fmt, path)
+        except BaseException as e:
+            with self._lock: self._inflight.pop(key, None)
+            future.set_exception(e)
+            raise
+        with self._lock:
+            self._paths[key] = path
+            self._paths.move_to_end(key)
+            self._evict()
+            self._inflight.pop(key, None)
+        future.set_result(path)
+        return path
@@ -0,0 +1,155 @@
+import difflib
+
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Location Hierarchy Index
+# -------------------------
+LOCATION_LEVELS = ["STATE_UT", "DISTRICT", "BLOCK", "VILLAGE", "PINCODE"]
+
+
+def is_set(value) -> bool:
+    if value is None or (isinstance(value, str) and value == ""): return False
+    return not pd.isna(value)
+
+def split_selection(selection, n_levels: int) -> tuple:
+    """Splits a per-level selection ("" or None = any) into its set leading prefix and the later set levels."""
+    selection = list(selection)[:n_levels]
+    prefix = []
+    for value in selection:
+        if not is_set(value): break
+        prefix.append(value)
+    residual = {i: v for i, v in enumerate(selection) if i > len(prefix) and is_set(v)}
+    return tuple(prefix), residual
+
+def sort_by_location(df: pd.DataFrame) -> pd.DataFrame:
+    """Orders rows by the location hierarchy so every location prefix is one contiguous row range."""
+    levels = [c for c in LOCATION_LEVELS if c in df.columns]
+    if not levels: return df
+    return df.sort_values(levels, kind="stable", na_position="last").reset_index(drop=True)
+
+
+class LocationIndex:
+    """Maps every (STATE_UT, DISTRICT, ...) prefix to its [start, stop) row range in a location-sorted frame."""
+
+    def __init__(self, df: pd.DataFrame):
+        self.levels = [c for c in LOCATION_LEVELS if c in df.columns]
+        self.n_rows = len(df)
+        self.ranges = {(): (0, self.n_rows)}
+        if not self.n_rows: return
+
+        values = [df[col].to_numpy() for col in self.levels]
+        boundary = np.zeros(self.n_rows, dtype=bool)
+        boundary[0] = True
+        for depth, col in enumerate(self.levels, 1):
+            codes = pd.factorize(df[col])[0]
+            boundary[1:] |= codes[1:] != codes[:-1]
+            starts = np.flatnonzero(boundary)
+            stops = np.append(starts[1:], self.n_rows)
+            keys = zip(*(level_values[starts] for level_values in values[:depth]))
+            for key, start, stop in zip(keys, starts.tolist(), stops.tolist()):
+                self.ranges[key] = (start, stop)
+
+    def __len__(self):
+        return self.n_rows
+
+    def resolve(self, selection) -> tuple:
+        """Returns (start, stop, residual) for a per-level selection where "" or None means "any".
+
+        Leading set levels resolve to one row range; levels set after a gap are returned as
+        residual {column: value} filters to apply to that (already narrowed) range.
+        """
+        prefix, residual = split_selection(selection, len(self.levels))
+        start, stop = self.ranges.get(prefix, (0, 0))
+        return start, stop, {self.levels[i]: v for i, v in residual.items()}
+
+    def select(self, df: pd.DataFrame, selection) -> pd.DataFrame:
+        """Selects the rows for a location without copying or scanning the full frame."""
+        start, stop, residual = self.resolve(selection)
+        df_sel = df.iloc[start:stop]
+        for col, value in residual.items():
+            df_sel = df_sel[df_sel[col] == value]
+        return df_sel
+
+
+# -------------------------
+# Manual Location Search
+# -------------------------
+def _normalize(text) -> str:
+    return " ".join(str(text).lower().split())
+
+def _trigrams(text: str) -> set:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class LocationSearch:
+    """Trigram index over the distinct location names of a LocationIndex.
+
+    Queries match location names (any level) by substring and resolve to row ranges through
+    the location index, so the cost depends on the number of distinct names, not on rows.
+    """
+
+    def __init__(self, index: LocationIndex):
+        self.index = index
+        self.names = []         # normalized name per id
+        self.display = []       # original spelling per id
+        self.keys_by_name = []  # location prefixes carrying that name, per id
+        self.postings = {}      # trigram -> set of name ids
+        ids = {}
+        for key in index.ranges:
+            if not key or not is_set(key[-1]): continue
+            raw = key[-1]
+            if isinstance(raw, (float, np.floating)) and float(raw).is_integer(): raw = int(raw)
+            name = _normalize(raw)
+            if name not in ids:
+                ids[name] = len(self.names)
+                self.names.append(name); self.display.append(str(raw)); self.keys_by_name.append([])
+                for gram in _trigrams(name):
+                    self.postings.setdefault(gram, set()).add(ids[name])
+            self.keys_by_name[ids[name]].append(key)
+
+    def match_ids(self, query: str) -> list:
+        q = _normalize(query)
+        if not q: return []
+        grams = _trigrams(q)
+        if grams:
+            candidates = set.intersection(*(self.postings.get(g, set()) for g in grams))
+        else:
+            candidates = range(len(self.names))
+        return sorted(i for i in candidates if q in self.names[i])
+
+    def ranges(self, query: str, start: int = 0, stop: int = None) -> list:
+        """Merged row ranges for every location whose name contains the query, clipped to [start, stop)."""
+        stop = self.index.n_rows if stop is None else stop
+        spans = sorted(self.index.ranges[key] for i in self.match_ids(query) for key in self.keys_by_name[i])
+        merged = []
+        for s, e in spans:
+            s, e = max(s, start), min(e, stop)
+            if s >= e: continue
+            if merged and s <= merged[-1][1]: merged[-1][1] = max(merged[-1][1], e)
+            else: merged.append([s, e])
+        return [tuple(span) for span in merged]
+
+    def select(self, df: pd.DataFrame, query: str, selection=()) -> pd.DataFrame:
+        """Rows matching the query within the current dropdown selection."""
+        start, stop, residual = self.index.resolve(selection)
+        spans = self.ranges(query, start, stop)
+        positions = np.concatenate([np.arange(s, e) for s, e in spans]) if spans else np.empty(0, dtype=np.int64)
+        df_sel = df.take(positions)
+        for col, value in residual.items():
+            df_sel = df_sel[df_sel[col] == value]
+        return df_sel
+
+    def suggest(self, query: str, limit: int = 5) -> list:
+        """Ranked, typo-tolerant name suggestions: trigram overlap first, then edit similarity."""
+        q = _normalize(query)
+        if not q: return []
+        counts = {}
+        for gram in _trigrams(q) or {q}:
+            for i in self.postings.get(gram, ()):
+                counts[i] = counts.get(i, 0) + 1
+        if not counts: return []
+        shortlist = sorted(counts, key=counts.get, reverse=True)[:limit * 20]
+        scored = sorted(shortlist, key=lambda i: (-difflib.SequenceMatcher(None, q, self.names[i]).ratio(), self.names[i]))
+        return [self.display[i] for i in scored[:limit]]
@@ -0,0 +1,101 @@
+import functools
+import math
+
+import numpy as np
+import pandas as pd
+
+from dwlr_index import LocationIndex, LocationSearch, sort_by_location
+from dwlr_store import DerivedTable
+
+# -------------------------
+# Latest Reading per Well
+# -------------------------
+WELL_KEYS = ["STATE_UT", "DISTRICT", "BLOCK", "VILLAGE"]
+WELL_COLUMNS = WELL_KEYS + ["PINCODE", "LATITUDE", "LONGITUDE", "DATE", "DTWL"]
+WELLS_DIR_NAME = "wells"
+
+
+def latest_wells(df: pd.DataFrame) -> pd.DataFrame:
+    """Most recent located reading for every well, sorted by location."""
+    columns = [c for c in WELL_COLUMNS if c in df.columns]
+    if not {"LATITUDE", "LONGITUDE"}.issubset(df.columns): return df.iloc[0:0][columns].reset_index(drop=True)
+    located = df.loc[df["LATITUDE"].notna() & df["LONGITUDE"].notna(), columns]
+    if located.empty: return located.reset_index(drop=True)
+    # Ties on the latest DATE go to the max DTWL, as in dwlr_cube.season_year_stats and merge_latest.
+    located = located.sort_values(["DATE", "DTWL"], kind="stable")
+    return sort_by_location(located.groupby(WELL_KEYS, observed=True, sort=False).tail(1))
+
+def merge_latest(*tables) -> pd.DataFrame:
+    combined = pd.concat(tables, ignore_index=True).sort_values(["DATE", "DTWL"], kind="stable")
+    return sort_by_location(combined.drop_duplicates(WELL_KEYS, keep="last"))
+
+
+class LatestWells(DerivedTable):
+    """Latest-reading-per-well table with its own location index, maintained at ingest time."""
+    NAME = WELLS_DIR_NAME
+
+    def __init__(self, wells: pd.DataFrame):
+        self.wells = wells
+        self.index = LocationIndex(wells)
+        self.covers = []  # store partitions folded into this table
+
+    @functools.cached_property
+    def search(self) -> LocationSearch:
+        return LocationSearch(self.index)
+
+    def select(self, selection, query: str = "") -> pd.DataFrame:
+        if query: return self.search.select(self.wells, query, selection)
+        return self.index.select(self.wells, selection)
+
+    def update(self, batch: pd.DataFrame):
+        if not {"LATITUDE", "LONGITUDE"}.issubset(batch.columns): return self
+        return LatestWells(merge_latest(self.wells, latest_wells(batch)))
+
+    @classmethod
+    def build(cls, df: pd.DataFrame):
+        return cls(latest_wells(df))
+
+    def frames(self) -> dict:
+        return {"latest_wells": self.wells}
+
+    @classmethod
+    def from_frames(cls, frames: dict, meta: dict):
+        return cls(frames["latest_wells"])
+
+
+load_or_build = LatestWells.load_or_build
+apply_batch = LatestWells.apply_batch
+
+# -------------------------
+# Viewport & Spatial Aggregation
+# -------------------------
+MAX_MAP_POINTS = 4000
+MIN_ZOOM, MAX_ZOOM = 3, 12
+
+
+def fit_viewport(wells: pd.DataFrame) -> dict:
+    """Center and mapbox zoom level that fit all wells of the selection."""
+    lat, lon = wells["LATITUDE"].to_numpy(np.float64), wells["LONGITUDE"].to_numpy(np.float64)
+    extent = max(lat.max() - lat.min(), lon.max() - lon.min(), 1e-3)
+    zoom = int(np.clip(math.floor(math.log2(360.0 / extent)) - 1, MIN_ZOOM, MAX_ZOOM))
+    return {"center": {"lat": float((lat.max() + lat.min()) / 2), "lon": float((lon.max() + lon.min()) / 2)}, "zoom": zoom}
+
+def grid_clusters(wells: pd.DataFrame, cell_deg: float, value: str = "DTWL") -> pd.DataFrame:
+    """Buckets wells into cell_deg x cell_deg grid cells with mean position, mean value and well count."""
+    lat, lon = wells["LATITUDE"].to_numpy(np.float64), wells["LONGITUDE"].to_numpy(np.float64)
+    cells = pd.DataFrame({"ROW": np.floor(lat / cell_deg).astype(np.int64), "COL": np.floor(lon / cell_deg).astype(np.int64),
+                          "LATITUDE": lat, "LONGITUDE": lon, value: wells[value].to_numpy(np.float64)})
+    clusters = cells.groupby(["ROW", "COL"], sort=False).agg(LATITUDE=("LATITUDE", "mean"), LONGITUDE=("LONGITUDE", "mean"),
+                                                            **{value: (value, "mean")}, WELLS=(value, "size"))
+    return clusters.reset_index(drop=True)
+
+def map_layer(wells: pd.DataFrame, zoom: int, max_points: int = MAX_MAP_POINTS, value: str = "DTWL") -> tuple:
+    """Returns (points, clustered). Wells are sent as-is when few enough, otherwise as grid clusters
+    starting at roughly 1/16 of a map tile for the zoom level and coarsened until they fit max_points."""
+    if len(wells) <= max_points: return wells, False
+    cell_deg = 360.0 / 2 ** zoom / 16
+    clusters = grid_clusters(wells, cell_deg, value)
+    while len(clusters) > max_points:
+        cell_deg *= 2
+        clusters = grid_clusters(wells, cell_deg, value)
+    return clusters, True
@@ -0,0 +1,112 @@
+import functools
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+logger = logging.getLogger("dwlr.profile")
+
+# -------------------------
+# Profiling Switches
+# -------------------------
+# Off unless DWLR_PROFILE is set; when off, spans are a shared no-op context and caches are not wrapped.
+PROFILE_ENABLED = os.environ.get("DWLR_PROFILE", "").lower() not in ("", "0", "false", "no")
+PROFILE_LOG = os.environ.get("DWLR_PROFILE_LOG")  # optional JSON-lines file, one record per run
+_NULL_SPAN = nullcontext()
+
+
+# -------------------------
+# Per-Run Spans & Counters
+# -------------------------
+class Profiler:
+    """Timing spans and counters for one script run (e.g. one Streamlit rerun)."""
+
+    def __init__(self, enabled: bool = PROFILE_ENABLED, **context):
+        self.enabled = enabled
+        self.context = context
+        self.spans = []  # {"name", "depth", "start_ms", "ms"} in completion order
+        self.counters = {}
+        self._depth = 0
+        self._started = time.time()
+        self._t0 = time.perf_counter()
+
+    def span(self, name: str):
+        return self._span(name) if self.enabled else _NULL_SPAN
+
+    @contextmanager
+    def _span(self, name: str):
+        depth = self._depth
+        self._depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self._depth = depth
+            self.spans.append({"name": name, "depth": depth, "start_ms": round(1000 * (start - self._t0), 3),
+                               "ms": round(1000 * (end - start), 3)})
+
+    def count(self, name: str, n: int = 1):
+        if self.enabled: self.counters[name] = self.counters.get(name, 0) + n
+
+    def timeline(self) -> list:
+        """Spans in start order, each with its nesting depth."""
+        return sorted(self.spans, key=lambda s: (s["start_ms"], s["depth"]))
+
+    def record(self, **extra) -> dict:
+        return {"ts": self._started, "total_ms": round(1000 * (time.perf_counter() - self._t0), 3), **self.context, **extra,
+                "spans": self.timeline(), "counters": dict(self.counters), "caches": cache_stats()}
+
+    def log(self, **extra) -> dict:
+        """Emits the run as one structured JSON log line (and appends it to DWLR_PROFILE_LOG if set)."""
+        record = self.record(**extra)
+        line = json.dumps(record, default=str)
+        logger.info(line)
+        if PROFILE_LOG:
+            with open(PROFILE_LOG, "a") as fh:
+                fh.write(line + "\n")
+        return record
+
+
+# -------------------------
+# Cache Hit/Miss Counters
+# -------------------------
+_cache_counters = {}
+_cache_lock = threading.Lock()
+
+def _bump(name: str, key: str):
+    with _cache_lock:
+        counts = _cache_counters.setdefault(name, {"calls": 0, "misses": 0})
+        counts[key] += 1
+
+def cache_stats() -> dict:
+    """Process-wide {function: {"calls", "hits", "misses"}} for functions wrapped with counted_cache."""
+    with _cache_lock:
+        return {name: {**c, "hits": c["calls"] - c["misses"]} for name, c in _cache_counters.items()}
+
+def counted_cache(cache_decorator, enabled: bool = PROFILE_ENABLED):
+    """Applies a Streamlit cache decorator (e.g. st.cache_data(ttl=60)) and counts calls and misses.
+
+    A miss is a run of the function body; every other call was served from the cache.
+    """
+    def decorate(fn):
+        if not enabled: return cache_decorator(fn)
+        name = fn.__name__
+
+        @functools.wraps(fn)
+        def body(*args, **kwargs):
+            _bump(name, "misses")
+            return fn(*args, **kwargs)
+
+        cached = cache_decorator(body)
+
+        @functools.wraps(fn)
+        def call(*args, **kwargs):
+            _bump(name, "calls")
+            return cached(*args, **kwargs)
+
+        call.clear = cached.clear
+        return call
+    return decorate
@@ -0,0 +1,187 @@
+import json
+import logging
+import math
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import pandas as pd
+
+import dwlr_analytics
+import dwlr_cube
+import dwlr_index
+import dwlr_map
+import dwlr_store
+
+logger = logging.getLogger(__name__)
+
+# -------------------------
+# Query Engine
+# -------------------------
+# Short request parameter names for each hierarchy level, in LOCATION_LEVELS order.
+LOCATION_PARAMS = ["state", "district", "block", "village", "pincode"]
+
+
+class QueryEngine:
+    """Loaded dataset plus every structure derived from it, queried by location.
+
+    A location is a sequence of per-level values ("" = any) or a dict keyed by
+    LOCATION_PARAMS or column names, e.g. {"state": "Kerala", "district": "Kollam"}.
+    """
+
+    def __init__(self, store_dir: str = dwlr_store.STORE_DIR, build: bool = True):
+        self.store_dir = store_dir
+        self.issues = dwlr_store.build_store(store_dir) if build else []
+        self.data_key = dwlr_store.data_fingerprint(store_dir)
+        self.df = dwlr_index.sort_by_location(dwlr_store.load_store(store_dir))
+        if self.df.empty:
+            self.cube = self.index = self.search = self.wells = self.trends = None
+            self.uniques = {"states": [], **{name: {} for name in dwlr_cube.UNIQUE_KEYS}}
+            return
+        self.cube = dwlr_cube.load_or_build(self.df, store_dir)
+        self.uniques = self.cube.location_uniques()
+        self.index = dwlr_index.LocationIndex(self.df)
+        self.search = dwlr_index.LocationSearch(self.index)
+        located = {"LATITUDE", "LONGITUDE"}.issubset(self.df.columns)
+        self.wells = dwlr_map.load_or_build(self.df, store_dir) if located else None
+        self.trends = dwlr_analytics.load_or_build(self.df, store_dir)
+
+    def selection(self, location=None) -> list:
+        if location is None: return [""] * len(LOCATION_PARAMS)
+        if isinstance(location, dict):
+            return [location.get(param, location.get(col, "")) for param, col in zip(LOCATION_PARAMS, dwlr_index.LOCATION_LEVELS)]
+        return list(location) + [""] * (len(LOCATION_PARAMS) - len(location))
+
+    def rows(self, location=None, query: str = "") -> pd.DataFrame:
+        if self.index is None: return self.df
+        selection = self.selection(location)
+        if query: return self.search.select(self.df, query, selection)
+        return self.index.select(self.df, selection)
+
+    def stats(self, location=None, query: str = "", rows: pd.DataFrame = None) -> pd.DataFrame:
+        """Season/year stats: a cube lookup for hierarchical locations, one groupby for searches."""
+        stats = None if query or self.cube is None else self.cube.stats(self.selection(location))
+        if stats is None: stats = dwlr_cube.season_year_stats(self.rows(location, query) if rows is None else rows)
+        return stats
+
+    def kpis(self, location=None, query: str = "") -> dict:
+        return dwlr_cube.kpis(self.stats(location, query))
+
+    def seasonal_trend(self, location=None, season: str = None, query: str = "") -> pd.DataFrame:
+        return dwlr_cube.seasonal_trend(self.stats(location, query), season)
+
+    def latest_wells(self, location=None, query: str = ""):
+        """Latest reading per well for the location, or None when the data has no coordinates."""
+        if self.wells is None: return None
+        return self.wells.select(self.selection(location), query)
+
+    def well_trends(self, location=None, query: str = "") -> pd.DataFrame:
+        """Per-well trend/anomaly rows for the location (see dwlr_analytics.well_trends)."""
+        if self.trends is None: return pd.DataFrame()
+        return self.trends.select(self.selection(location), query)
+
+    def suggest(self, query: str, limit: int = 5) -> list:
+        return self.search.suggest(query, limit) if self.search else []
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+def get_engine(store_dir: str = dwlr_store.STORE_DIR) -> QueryEngine:
+    """Process-wide engine shared by every caller; reloaded when the store changes (e.g. a batch is appended)."""
+    global _engine
+    engine = _engine
+    if engine is not None and engine.store_dir == store_dir and engine.data_key == dwlr_store.data_fingerprint(store_dir):
+        return engine
+    with _engine_lock:
+        if _engine is None or _engine.store_dir != store_dir:
+            _engine = QueryEngine(store_dir)
+        elif _engine.data_key != dwlr_store.data_fingerprint(store_dir):
+            _engine = QueryEngine(store_dir, build=False)
+        return _engine
+
+def kpis(location=None, query: str = "") -> dict:
+    return get_engine().kpis(location, query)
+
+def seasonal_trend(location=None, season: str = None, query: str = "") -> pd.DataFrame:
+    return get_engine().seasonal_trend(location, season, query)
+
+def latest_wells(location=None, query: str = ""):
+    return get_engine().latest_wells(location, query)
+
+def well_trends(location=None, query: str = "") -> pd.DataFrame:
+    return get_engine().well_trends(location, query)
+
+
+# -------------------------
+# Local HTTP/JSON Endpoint
+# -------------------------
+def _records(df) -> list:
+    if df is None: return []
+    # float32 values serialize with their binary error (12.34 -> 12.3400001526); float32 holds ~7 significant
+    # digits, so round in float64 to the 6 decimals the source data carries at most.
+    compact = df.select_dtypes("float32").columns
+    df = df.astype({c: np.float64 for c in compact}).round({c: 6 for c in compact})
+    return json.loads(df.to_json(orient="records", date_format="iso"))
+
+def _clean(value):
+    return None if isinstance(value, float) and math.isnan(value) else value
+
+def _location(params: dict) -> dict:
+    location = {p: params[p] for p in LOCATION_PARAMS if params.get(p)}
+    if "pincode" in location and location["pincode"].isdigit(): location["pincode"] = int(location["pincode"])
+    return location
+
+ROUTES = {
+    "/kpis": lambda e, p: {k: _clean(v) for k, v in e.kpis(_location(p), p.get("q", "")).items()},
+    "/trend": lambda e, p: _records(e.seasonal_trend(_location(p), p.get("season") or None, p.get("q", ""))),
+    "/wells": lambda e, p: _records(e.latest_wells(_location(p), p.get("q", ""))),
+    "/well-trends": lambda e, p: _records(e.well_trends(_location(p), p.get("q", ""))),
+    "/uniques": lambda e, p: json.loads(pd.Series(e.uniques).to_json()),
+    "/suggest": lambda e, p: e.suggest(p.get("q", "")),
+}
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """GET /kpis, /trend, /wells, /well-trends, /uniques, /suggest with ?state=&district=&block=&village=&pincode=&q=&season="""
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        route = ROUTES.get(url.path)
+        if route is None:
+            return self._send(404, {"error": f"unknown endpoint {url.path}", "endpoints": sorted(ROUTES)})
+        params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+        try:
+            self._send(200, route(get_engine(), params))
+        except Exception as e:
+            logger.exception("Query %s failed", self.path)
+            self._send(500, {"error": str(e)})
+
+    def _send(self, status: int, payload):
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, fmt, *args):
+        logger.info("%s - %s", self.address_string(), fmt % args)
+
+def serve(host: str = "127.0.0.1", port: int = 8765):
+    get_engine()  # load before accepting requests
+    server = ThreadingHTTPServer((host, port), QueryHandler)
+    logger.info("DWLR query API listening on http://%s:%d", host, port)
+    server.serve_forever()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve DWLR KPIs, trends and well locations as local JSON endpoints.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    serve(args.host, args.port)
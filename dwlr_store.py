@@ -0,0 +1,576 @@
+import hashlib
+import io
+import json
+import multiprocessing
+import os
+import tempfile
+import time
+import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import requests
+
+# -------------------------
+# Sources & Store Layout
+# -------------------------
+BASE_URL = "https://raw.githubusercontent.com/TharunPranav2007/Groundwater-Level-Monitoring-using-DWLR-Data/main/"
+SOURCE_FILES = [
+    "august_wl_1994-2023_compressed-clean.csv",
+    "january_wl_1994-2024-compressed-clean.xlsx",
+    "post-monsoon_wl_1994-2023_compressed-clean.xlsx",
+    "pre-monsoon_1994-2003-clean.csv",
+    "pre-monsoon_2004-2013-clean.csv",
+    "pre-monsoon_2014-2024-clean.csv"
+]
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+STORE_DIR = os.environ.get("DWLR_STORE_DIR", os.path.join(APP_DIR, ".dwlr_store"))
+FETCH_TIMEOUT = 60
+REVALIDATE_TIMEOUT = (3.05, 60)  # (connect, read): an unreachable host must not stall a start that has a stored copy
+MANIFEST_NAME = "manifest.json"
+LOCK_NAME = ".lock"
+PARTITION_GRACE_SECONDS = 3600  # younger unreferenced partitions may belong to a build still in progress
+# Bump whenever the cleaning or on-disk schema changes so old source partitions are rebuilt.
+STORE_VERSION = 4
+
+LOCATION_COLUMNS = ["STATE_UT", "DISTRICT", "BLOCK", "VILLAGE"]
+
+try:
+    import fcntl
+
+    def _lock_file(fh): fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+    def _unlock_file(fh): fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+except ImportError:  # Windows
+    import msvcrt
+
+    def _lock_file(fh):
+        while True:
+            try:
+                return msvcrt.locking(fh.fileno(), msvcrt.LK_LOCK, 1)
+            except OSError:  # LK_LOCK gives up after ~10s; keep waiting
+                pass
+    def _unlock_file(fh): msvcrt.locking(fh.fileno(), msvcrt.LK_UNLCK, 1)
+
+# calamine parses XLSX several times faster than openpyxl; fall back when it is not installed.
+try:
+    import python_calamine  # noqa: F401
+    XLSX_ENGINE = "calamine"
+except ImportError:
+    XLSX_ENGINE = "openpyxl"
+BATCH_REQUIRED_COLUMNS = LOCATION_COLUMNS + ["DATE", "DTWL"]
+DERIVED_META = "meta.json"
+DERIVED_GRACE_SECONDS = 60  # younger unreferenced derived files may belong to a concurrent save
+
+
+# -------------------------
+# Cleaning
+# -------------------------
+SEASONS = ["Premonsoon", "Postmonsoon", "Other", "Unknown"]
+PREMONSOON_MONTHS = [1, 2, 3, 4, 5]
+POSTMONSOON_MONTHS = [8, 10, 11, 12]
+FLOAT32_COLUMNS = ["DTWL", "LATITUDE", "LONGITUDE"]
+NUMERIC_COLUMNS = ["PINCODE"] + FLOAT32_COLUMNS
+
+def classify_seasons(dates: pd.Series) -> pd.Categorical:
+    month = dates.dt.month
+    codes = np.select([month.isin(PREMONSOON_MONTHS), month.isin(POSTMONSOON_MONTHS), month.notna()], [0, 1, 2], default=3)
+    return pd.Categorical.from_codes(codes.astype(np.int8), categories=SEASONS)
+
+def clean_frame(df: pd.DataFrame) -> pd.DataFrame:
+    df.columns = [str(c).strip().upper() for c in df.columns]
+    # Unparseable dates and numbers become nulls: the dropna below removes readings without DATE/DTWL,
+    # and one stray text value cannot turn a numeric column into text.
+    if "DATE" in df.columns and not pd.api.types.is_datetime64_any_dtype(df["DATE"]):
+        df["DATE"] = pd.to_datetime(df["DATE"], dayfirst=True, errors="coerce")
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns: df[col] = pd.to_numeric(df[col], errors="coerce")
+    for col in LOCATION_COLUMNS:
+        if col in df.columns:
+            df[col] = df[col].astype(str).str.strip().str.replace(r"\s+", " ", regex=True).replace({"nan": np.nan, "None": np.nan})
+            df.loc[df[col].notna(), col] = df.loc[df[col].notna(), col].str.title()
+    required = [c for c in ("DTWL", "DATE") if c in df.columns]
+    df = df.dropna(subset=required).reset_index(drop=True)
+    if "DATE" in df.columns:
+        df["SEASON"] = classify_seasons(df["DATE"])
+        df["YEAR"] = df["DATE"].dt.year.astype(np.int16)
+    return df
+
+def compact_frame(df: pd.DataFrame) -> pd.DataFrame:
+    """Stores repeated location names as categoricals and measurements as float32."""
+    for col in LOCATION_COLUMNS:
+        if col in df.columns: df[col] = df[col].astype("category")
+    for col in FLOAT32_COLUMNS:
+        if col in df.columns: df[col] = df[col].astype(np.float32)
+    return df
+
+def memory_report(before: int, after: int) -> dict:
+    before, after = int(before), int(after)
+    return {"before_bytes": before, "after_bytes": after, "saved_bytes": before - after,
+            "saved_pct": round(100.0 * (before - after) / before, 1) if before else 0.0}
+
+def clean_and_compact(df: pd.DataFrame) -> tuple:
+    """Returns (compacted frame, memory report of the cleaned frame before vs after compact_frame)."""
+    df = clean_frame(df)
+    before = df.memory_usage(deep=True, index=False).sum()
+    df = compact_frame(df)
+    return df, memory_report(before, df.memory_usage(deep=True, index=False).sum())
+
+def _arrow_safe(df: pd.DataFrame) -> pd.DataFrame:
+    # Feather needs one type per column; stray mixed object columns are stored as text.
+    for col in df.columns:
+        if df[col].dtype == object:
+            df[col] = df[col].where(df[col].isna(), df[col].astype(str))
+    return df
+
+
+# -------------------------
+# Fetching & Parsing
+# -------------------------
+def _fetch_source(name: str, etag: str = None, source_dir: str = APP_DIR, stored: bool = False):
+    """Returns (raw_bytes, etag); raw_bytes is None when the remote copy is unchanged, or when a stored
+    copy exists and DWLR_OFFLINE is set so the remote copy is not revalidated."""
+    local_path = os.path.join(source_dir, name)
+    if os.path.exists(local_path):
+        with open(local_path, "rb") as fh:
+            return fh.read(), None
+    if stored and os.environ.get("DWLR_OFFLINE", "0") not in ("", "0"): return None, etag
+    headers = {"If-None-Match": etag} if etag else {}
+    res = requests.get(BASE_URL + name, headers=headers, timeout=REVALIDATE_TIMEOUT if stored else FETCH_TIMEOUT)
+    if res.status_code == 304: return None, etag
+    res.raise_for_status()
+    return res.content, res.headers.get("ETag")
+
+def _read_csv(raw: bytes) -> pd.DataFrame:
+    try:
+        return pd.read_csv(io.BytesIO(raw), engine="pyarrow", encoding='utf-8')
+    except Exception:
+        # The multithreaded pyarrow reader rejects ragged or mixed-type files the C parser tolerates.
+        return pd.read_csv(io.BytesIO(raw), low_memory=False, encoding='utf-8')
+
+def _parse_source(name: str, raw: bytes) -> pd.DataFrame:
+    if name.endswith('.csv'): df = _read_csv(raw)
+    elif name.endswith('.xlsx'): df = pd.read_excel(io.BytesIO(raw), engine=XLSX_ENGINE)
+    else: raise ValueError(f"Unsupported source format: {name}")
+    return df
+
+def _source_digest(raw: bytes) -> str:
+    return hashlib.sha256(f"v{STORE_VERSION}:".encode() + raw).hexdigest()
+
+
+# -------------------------
+# Manifest
+# -------------------------
+def read_manifest(store_dir: str = STORE_DIR) -> dict:
+    path = os.path.join(store_dir, MANIFEST_NAME)
+    if not os.path.exists(path): return {"version": STORE_VERSION, "sources": {}, "batches": []}
+    with open(path) as fh:
+        manifest = json.load(fh)
+    # Appended batches exist nowhere else, so they are kept across versions; sources are re-parsed.
+    if manifest.get("version") != STORE_VERSION: return {"version": STORE_VERSION, "sources": {}, "batches": manifest.get("batches", [])}
+    manifest.setdefault("batches", [])
+    return manifest
+
+def _write_manifest(manifest: dict, store_dir: str = STORE_DIR):
+    tmp_path = os.path.join(store_dir, MANIFEST_NAME + ".tmp")
+    with open(tmp_path, "w") as fh:
+        json.dump(manifest, fh, indent=2)
+    os.replace(tmp_path, os.path.join(store_dir, MANIFEST_NAME))
+
+def _replace_atomically(path: str, write):
+    # Unique temp name: several processes may write the same file at once.
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    os.close(fd)
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path): os.remove(tmp_path)
+        raise
+
+@contextmanager
+def _store_lock(store_dir: str = STORE_DIR):
+    """Serializes manifest updates (build_store vs append_batch) across threads and processes."""
+    os.makedirs(store_dir, exist_ok=True)
+    with open(os.path.join(store_dir, LOCK_NAME), "a+b") as fh:
+        _lock_file(fh)
+        try:
+            yield
+        finally:
+            _unlock_file(fh)
+
+def _write_partition(df: pd.DataFrame, path: str):
+    # Uncompressed Arrow IPC: loading is a plain read with no decompression or parsing pass.
+    _replace_atomically(path, lambda tmp: feather.write_feather(_arrow_safe(df), tmp, compression="uncompressed"))
+
+def _partition_ok(store_dir: str, entry: dict) -> bool:
+    return bool(entry) and os.path.exists(os.path.join(store_dir, entry["file"]))
+
+def _prune_partitions(manifest: dict, replaced: set, store_dir: str = STORE_DIR):
+    # Called under the store lock, so every appended batch is already in the manifest. Removes the
+    # partitions a build replaced at once, and other unreferenced ones (an older STORE_VERSION, an
+    # interrupted build) once no concurrent build can still be about to commit them.
+    live = {e["file"] for e in list(manifest["sources"].values()) + manifest["batches"]}
+    cutoff = time.time() - PARTITION_GRACE_SECONDS
+    for entry in os.scandir(store_dir):
+        if not entry.name.endswith((".feather", ".tmp")) or entry.name in live: continue
+        try:
+            if entry.name in replaced or entry.stat().st_mtime < cutoff: os.remove(entry.path)
+        except FileNotFoundError:
+            pass
+
+
+# -------------------------
+# Build & Load
+# -------------------------
+def _check_source(name: str, entry: dict, store_dir: str, source_dir: str) -> dict:
+    """Fetches one source and decides whether it needs parsing (I/O only, runs on a thread)."""
+    have_partition = _partition_ok(store_dir, entry)
+    job = {"name": name, "have_partition": have_partition, "raw": None, "timings": {}}
+    start = time.perf_counter()
+    try:
+        raw, etag = _fetch_source(name, entry.get("etag") if have_partition else None, source_dir, have_partition)
+    except Exception as e:
+        job["error"] = e
+        return job
+    finally:
+        job["timings"]["fetch"] = time.perf_counter() - start
+    if raw is None: return job
+    digest = _source_digest(raw)
+    if have_partition and entry["sha256"] == digest: return job
+    job.update(raw=raw, etag=etag, digest=digest)
+    return job
+
+def _ingest_source(name: str, raw: bytes, digest: str, etag: str, store_dir: str) -> dict:
+    """Parses, cleans and writes one source partition (CPU-bound, runs in a worker process)."""
+    clock, timings = time.perf_counter, {}
+    start = clock()
+    df = _parse_source(name, raw)
+    timings["parse"] = clock() - start
+    start = clock()
+    df, memory = clean_and_compact(df)
+    timings["clean"] = clock() - start
+    if df.empty: raise ValueError("source contained no usable rows")
+    start = clock()
+    part_file = f"{os.path.splitext(name)[0]}-{digest[:16]}.feather"
+    _write_partition(df, os.path.join(store_dir, part_file))
+    timings["write"] = clock() - start
+    return {"entry": {"file": part_file, "sha256": digest, "etag": etag, "rows": len(df), "memory": memory}, "timings": timings}
+
+def _source_issue(job: dict, error: Exception) -> str:
+    if job["have_partition"]: return f"Could not refresh {job['name']}; using the stored copy. Error: {error}"
+    return f"Could not read file: {job['name']}. Error: {error}"
+
+def build_store(store_dir: str = STORE_DIR, workers: int = None, sources: list = None, source_dir: str = APP_DIR) -> list:
+    """Converts each source (SOURCE_FILES by default) into a typed Feather partition, skipping sources
+    whose hash is unchanged. Local copies in source_dir are used instead of downloading.
+
+    Sources are fetched concurrently and the changed ones are parsed in parallel worker processes, so
+    a cold start takes about as long as the slowest file. A failing source only affects itself.
+    Per-source timings of the run are kept under "last_build" in the manifest (see build_report).
+    Returns a list of human-readable warnings for sources that could not be refreshed.
+    """
+    os.makedirs(store_dir, exist_ok=True)
+    manifest = read_manifest(store_dir)
+    previous = {e["file"] for e in manifest["sources"].values()}
+    started = time.perf_counter()
+    sources = sources or SOURCE_FILES
+    with ThreadPoolExecutor(max_workers=len(sources)) as pool:
+        jobs = list(pool.map(lambda name: _check_source(name, manifest["sources"].get(name), store_dir, source_dir), sources))
+
+    issues, report = [], {}
+    pending = [job for job in jobs if job["raw"] is not None]
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    # Spawned (not forked) workers: the dashboard calls this from a threaded server process.
+    pool = ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn")) if workers > 1 else None
+    try:
+        futures = {}
+        for job in pending:
+            args = (job["name"], job.pop("raw"), job["digest"], job["etag"], store_dir)
+            futures[job["name"]] = pool.submit(_ingest_source, *args) if pool else args
+        for job in jobs:
+            name, status = job["name"], "unchanged"
+            if "error" in job:
+                issues.append(_source_issue(job, job["error"])); status = "failed"
+            elif name in futures:
+                try:
+                    future = futures[name]
+                    result = future.result() if pool else _ingest_source(*future)
+                    manifest["sources"][name] = result["entry"]
+                    job["timings"].update(result["timings"]); status = "rebuilt"
+                except Exception as e:
+                    issues.append(_source_issue(job, e)); status = "failed"
+            report[name] = {"status": status, **{k: round(v, 3) for k, v in job["timings"].items()}}
+    finally:
+        if pool: pool.shutdown()
+
+    with _store_lock(store_dir):
+        # Re-read so batches appended while this build was parsing are kept.
+        current = read_manifest(store_dir)
+        previous |= {e["file"] for e in current["sources"].values()}
+        # The store holds exactly the requested sources, in their given order (see partition_paths).
+        current["sources"] = {name: manifest["sources"][name] for name in sources if name in manifest["sources"]}
+        current["last_build"] = {"wall_seconds": round(time.perf_counter() - started, 3), "workers": max(workers, 1), "sources": report}
+        _write_manifest(current, store_dir)
+        _prune_partitions(current, previous, store_dir)
+    return issues
+
+def build_report(store_dir: str = STORE_DIR) -> str:
+    """Per-source timing breakdown of the last build_store run."""
+    last = read_manifest(store_dir).get("last_build")
+    if not last: return "No build recorded yet."
+    lines = [f"Built in {last['wall_seconds']:.2f}s with {last['workers']} worker(s)"]
+    for name, r in last["sources"].items():
+        steps = ", ".join(f"{k} {r[k]:.2f}s" for k in ("fetch", "parse", "clean", "write") if k in r)
+        lines.append(f"  {name}: {r['status']} ({steps})")
+    return "\n".join(lines)
+
+def partition_paths(store_dir: str = STORE_DIR) -> list:
+    manifest = read_manifest(store_dir)
+    entries = [e for e in list(manifest["sources"].values()) + manifest["batches"] if _partition_ok(store_dir, e)]
+    return [os.path.join(store_dir, e["file"]) for e in entries]
+
+def data_fingerprint(store_dir: str = STORE_DIR) -> str:
+    """Changes whenever any stored partition changes; used to key caches derived from the data."""
+    return hashlib.sha1("|".join(os.path.basename(p) for p in partition_paths(store_dir)).encode()).hexdigest()
+
+def load_store(store_dir: str = STORE_DIR) -> pd.DataFrame:
+    """Reads every partition into one pandas frame (a full in-memory copy; nothing stays memory-mapped)."""
+    tables = [feather.read_table(path) for path in partition_paths(store_dir)]
+    if not tables: return pd.DataFrame()
+    # Arrow buffers are released column by column during conversion, so the peak stays near one copy.
+    return pa.concat_tables(tables, promote_options="permissive").to_pandas(split_blocks=True, self_destruct=True)
+
+def memory_savings(store_dir: str = STORE_DIR) -> dict:
+    """Resident size of the stored data versus the same cleaned rows before compact_frame."""
+    manifest = read_manifest(store_dir)
+    sources = list(manifest["sources"].values()) + manifest["batches"]
+    return memory_report(sum(e["memory"]["before_bytes"] for e in sources), sum(e["memory"]["after_bytes"] for e in sources))
+
+
+# -------------------------
+# Incremental Batches
+# -------------------------
+def read_batch(path: str) -> pd.DataFrame:
+    with open(path, "rb") as fh:
+        return _parse_source(os.path.basename(path), fh.read())
+
+def prepare_batch(batch: pd.DataFrame) -> tuple:
+    """Validates a telemetry batch and normalizes it exactly like the source files; returns (batch, memory report)."""
+    batch = batch.copy()
+    batch.columns = [str(c).strip().upper() for c in batch.columns]
+    missing = [c for c in BATCH_REQUIRED_COLUMNS if c not in batch.columns]
+    if missing: raise ValueError(f"Batch is missing required columns: {', '.join(missing)}")
+    batch, memory = clean_and_compact(batch)
+    if batch.empty: raise ValueError("Batch contains no rows with a valid DATE and DTWL.")
+    return batch, memory
+
+def _check_schema(batch: pd.DataFrame, store_dir: str):
+    """Raises ValueError when the batch's column types cannot be combined with the stored partitions."""
+    schemas = [pa.ipc.open_file(path).schema for path in partition_paths(store_dir)]
+    try:
+        pa.unify_schemas(schemas + [pa.Schema.from_pandas(batch, preserve_index=False)], promote_options="permissive")
+    except (pa.ArrowTypeError, pa.ArrowInvalid) as e:
+        raise ValueError(f"Batch columns do not match the stored data: {e}") from e
+
+def _store_batch(batch, store_dir: str) -> tuple:
+    """Writes a batch partition and records it in the manifest; returns (batch, partition file) or (None, None)."""
+    if isinstance(batch, str): batch = read_batch(batch)
+    batch, memory = prepare_batch(batch)
+    batch = _arrow_safe(batch)
+    digest = hashlib.sha256(f"v{STORE_VERSION}:".encode() + pd.util.hash_pandas_object(batch, index=False).to_numpy().tobytes()).hexdigest()
+    with _store_lock(store_dir):
+        manifest = read_manifest(store_dir)
+        if any(e["sha256"] == digest for e in manifest["batches"]): return None, None
+        _check_schema(batch, store_dir)
+        part_file = f"batch-{time.strftime('%Y%m%d%H%M%S')}-{digest[:16]}.feather"
+        _write_partition(batch, os.path.join(store_dir, part_file))
+        manifest["batches"].append({"file": part_file, "sha256": digest, "rows": len(batch), "memory": memory})
+        _write_manifest(manifest, store_dir)
+    return batch, part_file
+
+def _remove_batch(part_file: str, store_dir: str):
+    with _store_lock(store_dir):
+        manifest = read_manifest(store_dir)
+        manifest["batches"] = [e for e in manifest["batches"] if e["file"] != part_file]
+        _write_manifest(manifest, store_dir)
+        os.remove(os.path.join(store_dir, part_file))
+
+def append_batch(batch, store_dir: str = STORE_DIR):
+    """Stores a new batch of readings as its own partition without touching existing ones.
+
+    Accepts a DataFrame or a CSV/XLSX path. Returns the normalized batch, or None if an
+    identical batch was already appended. Raises ValueError, before writing anything, for a
+    batch that is invalid or whose column types conflict with the stored data.
+    """
+    return _store_batch(batch, store_dir)[0]
+
+def ingest_batch(batch, store_dir: str = STORE_DIR):
+    """Appends a batch (see append_batch) and folds it into the stored aggregate cube and latest-wells table.
+
+    This is the entry point for new readings; append_batch alone leaves those tables to a full rebuild.
+    Returns the normalized batch, or None if an identical batch was already appended. If folding
+    fails the partition is removed again, so a batch is either fully ingested or not at all.
+    """
+    import dwlr_cube  # imported here: both modules build on this one
+    import dwlr_map
+    batch, part_file = _store_batch(batch, store_dir)
+    if batch is None: return None
+    try:
+        dwlr_cube.apply_batch(batch, store_dir)
+        dwlr_map.apply_batch(batch, store_dir)
+    except Exception:
+        _remove_batch(part_file, store_dir)  # derived tables that already took it no longer match and are rebuilt
+        raise
+    return batch
+
+
+# -------------------------
+# Derived Tables
+# -------------------------
+# Tables computed from the partitions (aggregate cube, latest wells, well trends) live in their own
+# subdirectory, since top-level .feather files are data partitions. Each save writes a new generation
+# of files and then replaces the meta file listing them, so readers always see one complete table.
+def partition_names(store_dir: str = STORE_DIR) -> list:
+    return [os.path.basename(p) for p in partition_paths(store_dir)]
+
+def _read_derived_meta(directory: str):
+    try:
+        with open(os.path.join(directory, DERIVED_META)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return None
+
+def _remove_files(directory: str, names):
+    for name in names:
+        try:
+            os.remove(os.path.join(directory, name))
+        except FileNotFoundError:
+            pass
+
+def write_derived(store_dir: str, name: str, frames: dict, meta: dict):
+    """Stores {key: DataFrame} plus meta as derived table `name`, replacing the previous generation."""
+    directory = os.path.join(store_dir, name)
+    os.makedirs(directory, exist_ok=True)
+    generation = uuid.uuid4().hex[:12]
+    files = {key: f"{key}-{generation}.feather" for key in frames}
+    for key, df in frames.items():
+        _replace_atomically(os.path.join(directory, files[key]), lambda tmp, df=df: feather.write_feather(df, tmp))
+    def write_meta(tmp):
+        with open(tmp, "w") as fh:
+            json.dump({**meta, "files": files}, fh)
+    previous = _read_derived_meta(directory) or {}
+    _replace_atomically(os.path.join(directory, DERIVED_META), write_meta)
+
+    # The superseded generation goes at once; other unreferenced files (crashed or overlapping saves,
+    # older layouts) once they are past the grace period.
+    stale, cutoff = list(previous.get("files", {}).values()), time.time() - DERIVED_GRACE_SECONDS
+    for entry in os.scandir(directory):
+        try:
+            if entry.name != DERIVED_META and entry.name not in files.values() and entry.stat().st_mtime < cutoff:
+                stale.append(entry.name)
+        except FileNotFoundError:
+            pass
+    _remove_files(directory, stale)
+
+def read_derived(store_dir: str, name: str):
+    """(frames, meta) of derived table `name`, or None when it is missing."""
+    directory = os.path.join(store_dir, name)
+    for _ in range(3):
+        meta = _read_derived_meta(directory)
+        if meta is None or "files" not in meta: return None
+        try:
+            return {key: feather.read_feather(os.path.join(directory, file)) for key, file in meta["files"].items()}, meta
+        except FileNotFoundError:
+            continue  # a concurrent save replaced this generation; read the new one
+    return None
+
+def drop_derived(store_dir: str, name: str):
+    directory = os.path.join(store_dir, name)
+    meta = _read_derived_meta(directory)
+    if meta is None: return
+    _remove_files(directory, [DERIVED_META] + list(meta.get("files", {}).values()))
+
+
+class DerivedTable:
+    """Base for tables computed from the store partitions and persisted next to them.
+
+    Subclasses set NAME (their subdirectory) and implement build, frames/from_frames and, when a new
+    batch can be folded in without a full rebuild, update. `covers` lists the partitions a table was
+    computed from; a stored table is only used while it covers exactly the current partitions.
+    """
+    NAME = None
+
+    @classmethod
+    def build(cls, df: pd.DataFrame): raise NotImplementedError
+    @classmethod
+    def from_frames(cls, frames: dict, meta: dict): raise NotImplementedError
+    def frames(self) -> dict: raise NotImplementedError
+    def meta(self) -> dict: return {}
+    def update(self, batch: pd.DataFrame): raise NotImplementedError  # returns the updated table
+
+    def save(self, store_dir: str = STORE_DIR):
+        write_derived(store_dir, self.NAME, self.frames(), {**self.meta(), "covers": self.covers})
+
+    @classmethod
+    def load(cls, store_dir: str = STORE_DIR):
+        stored = read_derived(store_dir, cls.NAME)
+        if stored is None: return None
+        table = cls.from_frames(*stored)
+        table.covers = stored[1]["covers"]
+        return table
+
+    @classmethod
+    def load_or_build(cls, df: pd.DataFrame, store_dir: str = STORE_DIR):
+        """Uses the stored table when it covers exactly the current partitions, otherwise rebuilds and stores it."""
+        partitions = partition_names(store_dir)
+        table = cls.load(store_dir)
+        if table is not None and table.covers == partitions: return table
+        table = cls.build(df)
+        table.covers = partitions
+        table.save(store_dir)
+        return table
+
+    @classmethod
+    def apply_batch(cls, batch: pd.DataFrame, store_dir: str = STORE_DIR) -> bool:
+        """Folds a just-appended batch (the newest partition) into the stored table, or builds the table
+        from it when it is the only partition. Returns False if the stored table was stale or missing;
+        a stale table is dropped, and either way the table is rebuilt on next load."""
+        partitions = partition_names(store_dir)
+        table = cls.load(store_dir)
+        covers = table.covers if table is not None else []
+        if not partitions or covers != partitions[:-1]:
+            drop_derived(store_dir, cls.NAME)
+            return False
+        table = table.update(batch) if table is not None else cls.build(batch)
+        table.covers = partitions
+        table.save(store_dir)
+        return True
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the DWLR columnar store or append a batch of new readings.")
+    parser.add_argument("--append", metavar="PATH", nargs="+", help="CSV/XLSX telemetry batches to append")
+    args = parser.parse_args()
+
+    if args.append:
+        for path in args.append:
+            try:
+                batch = ingest_batch(path)
+            except ValueError as e:
+                print(f"{path}: rejected, {e}")
+                continue
+            if batch is None: print(f"{path}: already appended, skipped")
+            else: print(f"{path}: appended {len(batch)} rows")
+    else:
+        for issue in build_store():
+            print(issue)
+        print(build_report())
+    report = memory_savings()
+    print(f"Stored frame: {report['after_bytes'] / 2**20:.1f} MiB (was {report['before_bytes'] / 2**20:.1f} MiB before compaction, "
+          f"{report['saved_pct']}% saved)")
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+
+# -------------------------
+# Synthetic DWLR Data
+# -------------------------
+# Readings follow the source files: January, pre-monsoon (Apr/May), August and post-monsoon (Nov).
+READING_MONTHS = np.array([1, 4, 5, 8, 11])
+SYLLABLES = ["ka", "ra", "pa", "li", "ma", "du", "ko", "va", "ne", "ti", "sa", "go", "ha", "bel", "gan", "chi", "nal", "ur"]
+SUFFIXES = ["", "pur", "nagar", "halli", "palayam", "gaon", "abad", "kere"]
+# Rough latitude/longitude box for mainland India.
+LAT_RANGE, LON_RANGE = (8.0, 34.0), (69.0, 96.0)
+
+
+def _names(rng: np.random.Generator, n: int) -> np.ndarray:
+    parts = rng.choice(SYLLABLES, size=(n, 3))
+    suffix = rng.choice(SUFFIXES, size=n)
+    names = ["".join(p) + s for p, s in zip(parts, suffix)]
+    # Raw sources are inconsistently cased and spaced; ingestion is expected to normalize that.
+    return np.array([n.upper() if i % 7 == 0 else f" {n} " if i % 5 == 0 else n for i, n in enumerate(names)], dtype=object)
+
+def generate_wells(n_wells: int, seed: int = 0) -> pd.DataFrame:
+    """Well master table with a STATE_UT > DISTRICT > BLOCK > VILLAGE > PINCODE hierarchy and coordinates."""
+    rng = np.random.default_rng(seed)
+    n_states = int(np.clip(n_wells // 2000, 2, 36))
+    n_districts = int(np.clip(n_wells // 200, n_states, 780))
+    n_blocks = int(np.clip(n_wells // 20, n_districts, 7000))
+    n_villages = max(n_wells // 2, n_blocks)
+
+    state_of_district = rng.integers(0, n_states, n_districts)
+    district_of_block = rng.integers(0, n_districts, n_blocks)
+    block_of_village = rng.integers(0, n_blocks, n_villages)
+    village_of_well = rng.integers(0, n_villages, n_wells)
+    block = block_of_village[village_of_well]
+    district = district_of_block[block]
+    state = state_of_district[district]
+
+    state_lat = rng.uniform(*LAT_RANGE, n_states)
+    state_lon = rng.uniform(*LON_RANGE, n_states)
+    return pd.DataFrame({
+        "STATE_UT": _names(rng, n_states)[state],
+        "DISTRICT": _names(rng, n_districts)[district],
+        "BLOCK": _names(rng, n_blocks)[block],
+        "VILLAGE": _names(rng, n_villages)[village_of_well],
+        "PINCODE": 110000 + village_of_well % 750000,
+        "LATITUDE": np.clip(state_lat[state] + rng.normal(0, 1.5, n_wells), *LAT_RANGE),
+        "LONGITUDE": np.clip(state_lon[state] + rng.normal(0, 1.5, n_wells), *LON_RANGE),
+        # Per-well depth model: base depth (m), long-term trend (m/yr) and monsoon recharge amplitude (m).
+        "BASE": rng.gamma(2.0, 4.0, n_wells),
+        "TREND": rng.normal(0.05, 0.15, n_wells),
+        "AMPLITUDE": rng.gamma(2.0, 1.0, n_wells),
+    })
+
+def generate_readings(wells: pd.DataFrame, n_rows: int, seed: int = 0, start_year: int = 1994, end_year: int = 2024) -> pd.DataFrame:
+    """n_rows raw readings over the given wells in the source-file schema (DATE, DTWL, location, LAT/LON)."""
+    rng = np.random.default_rng(seed)
+    well = rng.integers(0, len(wells), n_rows)
+    year = rng.integers(start_year, end_year + 1, n_rows)
+    month = READING_MONTHS[rng.integers(0, len(READING_MONTHS), n_rows)]
+    day = rng.integers(1, 29, n_rows)
+    dates = pd.to_datetime({"year": year, "month": month, "day": day})
+
+    base, trend, amplitude = (wells[c].to_numpy()[well] for c in ("BASE", "TREND", "AMPLITUDE"))
+    # Deepest before the monsoon (May), shallowest after it (Aug-Nov).
+    seasonal = amplitude * np.cos((month - 5) / 12 * 2 * np.pi)
+    dtwl = base + trend * (year - start_year) + seasonal + rng.normal(0, 0.4, n_rows)
+    drops = rng.random(n_rows) < 0.002
+    dtwl[drops] += rng.gamma(2.0, 3.0, drops.sum())
+
+    frame = wells.iloc[well][["STATE_UT", "DISTRICT", "BLOCK", "VILLAGE", "PINCODE", "LATITUDE", "LONGITUDE"]].reset_index(drop=True)
+    frame.insert(5, "DATE", dates)
+    frame.insert(6, "DTWL", np.round(np.maximum(dtwl, 0.05), 2))
+    return frame
+
+def iter_readings(n_rows: int, n_wells: int = None, chunk_rows: int = 1_000_000, seed: int = 0):
+    """Yields synthetic reading frames of at most chunk_rows rows, totalling n_rows (10^5 up to 10^8)."""
+    n_wells = n_wells or int(np.clip(n_rows // 60, 100, 60_000))
+    wells = generate_wells(n_wells, seed)
+    for i, start in enumerate(range(0, n_rows, chunk_rows)):
+        yield generate_readings(wells, min(chunk_rows, n_rows - start), seed=seed + 1 + i)
@@ -0,0 +1,130 @@
+import logging
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+logger = logging.getLogger(__name__)
+
+# -------------------------
+# Backends
+# -------------------------
+OPENWEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+
+
+class OpenWeatherBackend:
+    """Current conditions from OpenWeatherMap over one pooled keep-alive session."""
+
+    def __init__(self, api_key: str, timeout=(3.05, 5.0), pool_size: int = 8):
+        self.api_key = api_key
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=1)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+
+    def fetch(self, district: str, state: str) -> dict:
+        if not self.api_key: raise RuntimeError("no OpenWeatherMap API key configured")
+        location = f"{district},{state},IN" if district else f"{state},IN"
+        res = self.session.get(OPENWEATHER_URL, params={"q": location, "appid": self.api_key, "units": "metric"}, timeout=self.timeout)
+        res.raise_for_status()
+        data = res.json()
+        return {"temp": float(data["main"]["temp"]), "humidity": float(data["main"]["humidity"])}
+
+
+class StubBackend:
+    """Offline backend with deterministic per-location readings and configurable latency."""
+
+    def __init__(self, latency: float = 0.0, fail: bool = False):
+        self.latency = latency
+        self.fail = fail
+        self.calls = 0
+
+    def fetch(self, district: str, state: str) -> dict:
+        self.calls += 1
+        if self.latency: time.sleep(self.latency)
+        if self.fail: raise RuntimeError("stub weather backend configured to fail")
+        seed = zlib.crc32(f"{district}|{state}".encode())
+        return {"temp": 22.0 + seed % 150 / 10, "humidity": 40.0 + seed % 500 / 10}
+
+
+# -------------------------
+# Client
+# -------------------------
+class WeatherClient:
+    """TTL+LRU cached weather lookups keyed by (district, state), fetched in the background.
+
+    Concurrent requests for the same location share one in-flight fetch. Failures are logged
+    and cached for a shorter TTL so a flaky API is not hammered on every rerun.
+    """
+
+    def __init__(self, backend, ttl: float = 600.0, error_ttl: float = 60.0, max_entries: int = 256, workers: int = 4):
+        self.backend = backend
+        self.ttl = ttl
+        self.error_ttl = error_ttl
+        self.max_entries = max_entries
+        self._cache = OrderedDict()  # key -> (expires_at, value)
+        self._inflight = {}          # key -> Future
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="weather")
+        self.counters = {"hits": 0, "misses": 0, "coalesced": 0, "errors": 0}
+
+    def _cached(self, key):
+        entry = self._cache.get(key)
+        if entry is None: return False, None
+        if entry[0] < time.monotonic():
+            del self._cache[key]
+            return False, None
+        self._cache.move_to_end(key)
+        return True, entry[1]
+
+    def _load(self, key):
+        value, ttl = None, self.ttl
+        try:
+            value = self.backend.fetch(*key)
+        except Exception as e:
+            logger.warning("Weather lookup failed for %s: %s", key, e)
+            ttl = self.error_ttl
+            with self._lock: self.counters["errors"] += 1
+        with self._lock:
+            self._cache[key] = (time.monotonic() + ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries: self._cache.popitem(last=False)
+            self._inflight.pop(key, None)
+        return value
+
+    def fetch_async(self, district: str, state: str) -> Future:
+        """Returns a Future resolving to {"temp", "humidity"} or None when weather is unavailable."""
+        key = (district or "", state or "")
+        if not key[1]:
+            future = Future()
+            future.set_result(None)
+            return future
+        with self._lock:
+            hit, value = self._cached(key)
+            if hit:
+                self.counters["hits"] += 1
+                future = Future()
+                future.set_result(value)
+                return future
+            if key in self._inflight:
+                self.counters["coalesced"] += 1
+                return self._inflight[key]
+            self.counters["misses"] += 1
+            future = self._executor.submit(self._load, key)
+            self._inflight[key] = future
+            return future
+
+    def get(self, district: str, state: str, timeout: float = None):
+        return self.fetch_async(district, state).result(timeout)
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self.counters, entries=len(self._cache))
+        lookups = stats["hits"] + stats["misses"] + stats["coalesced"]
+        stats["hit_rate"] = (stats["hits"] + stats["coalesced"]) / lookups if lookups else 0.0
+        return stats